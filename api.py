@@ -0,0 +1,292 @@
+import codecs
+import json
+import time
+from itertools import chain
+
+from flask import Blueprint, Response, abort, jsonify, request, stream_with_context
+
+from cache import result_cache
+from codec import CONVERTERS, TEXT_ENCODINGS, TEXT_ERRORS, VALIDATORS, _is_bases, _is_bits, text_options
+from limits import check_input
+from metrics import CountingIterator, metrics, timed
+from schemes import get_scheme
+from stream import iter_convert, read_chunks
+
+# Machine-facing endpoints: the raw request body goes in, the raw result
+# comes out, without form parsing or rendering the HTML page.
+#
+#   curl --data-binary 'Hi' -H 'Content-Type: text/plain' \
+#        http://localhost:5000/api/v1/convert/text_to_dna
+#
+# text/plain bodies are decoded with their charset (UTF-8 by default) and
+# answered in UTF-8. application/octet-stream bodies are taken byte for
+# byte (latin-1), and text results are returned the same way, so binary
+# files round trip exactly.
+#
+# Text modes write each character as its code point in 8 bits by default.
+# ?text_encoding=utf-8 (or utf-16, latin-1) encodes text to bytes first,
+# which round trips all of Unicode, and ?text_errors=replace (or ignore,
+# backslashreplace) sets how undecodable bytes in text output are handled.
+# ?scheme=goldman (or any name in schemes.SCHEMES) picks another base
+# mapping; those bodies are converted whole instead of streamed.
+
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+
+OCTET_STREAM = 'application/octet-stream'
+NDJSON_TYPES = ('application/x-ndjson', 'application/jsonl')
+# Request body bytes read and converted per step when streaming
+STREAM_CHUNK_SIZE = 64 << 10
+
+
+def body_encoding(mimetype, params):
+    if mimetype == OCTET_STREAM:
+        return 'latin-1'
+    return params.get('charset', 'utf-8')
+
+
+def request_encoding():
+    return body_encoding(request.mimetype, request.mimetype_params)
+
+
+def response_type(encoding):
+    if request.mimetype == OCTET_STREAM:
+        return OCTET_STREAM
+    return 'text/plain; charset=%s' % encoding
+
+
+def strict_requested():
+    # ?strict=1 rejects invalid DNA/binary input up front with its position
+    return request.args.get('strict', '').lower() in ('1', 'true', 'yes')
+
+
+def text_settings(encoding, errors):
+    # (encoding, errors) checked against the supported choices, or a
+    # ValueError naming the bad one
+    encoding = encoding or 'legacy'
+    errors = errors or 'strict'
+    if encoding not in TEXT_ENCODINGS:
+        raise ValueError('unknown text encoding %r, expected one of %s' % (encoding, ', '.join(TEXT_ENCODINGS)))
+    if errors not in TEXT_ERRORS:
+        raise ValueError('unknown text error policy %r, expected one of %s' % (errors, ', '.join(TEXT_ERRORS)))
+    return encoding, errors
+
+
+def error_response(message, status=400):
+    return Response(f"Error: {message}\n", status=status, mimetype='text/plain')
+
+
+def iter_encoded(results, encoding):
+    # One encoder for the whole response, so encodings with a byte order
+    # mark (utf-16, utf-32) write it once and not at every chunk
+    encoder = codecs.getincrementalencoder(encoding)()
+    for result in results:
+        yield encoder.encode(result)
+    tail = encoder.encode('', True)
+    if tail:
+        yield tail
+
+
+@api.route('/convert/<mode>', methods=['POST'])
+def convert(mode):
+    # The body is read from request.stream in chunks and the result is
+    # streamed back as it is produced, so neither the input nor the output
+    # is ever held in memory as a whole.
+    if mode not in CONVERTERS:
+        abort(404)
+    encoding = request_encoding()
+    try:
+        text_encoding, text_errors = text_settings(request.args.get('text_encoding'),
+                                                   request.args.get('text_errors'))
+        scheme = get_scheme(request.args.get('scheme'))
+    except ValueError as e:
+        return error_response(e)
+    if scheme.name != 'standard':
+        return convert_whole(mode, scheme.name, encoding, text_options(mode, text_encoding, text_errors))
+    chunks = read_chunks(request.stream, STREAM_CHUNK_SIZE)
+    if metrics.enabled:
+        chunks = CountingIterator(chunks)
+    results = iter_encoded(iter_convert(mode, chunks, errors='strict', encoding=encoding,
+                                        strict=strict_requested(), text_encoding=text_encoding,
+                                        text_errors=text_errors), encoding)
+    if metrics.enabled:
+        results = timed(results, mode, lambda: chunks.size)
+    # Produce the first piece before answering, so bad input that shows
+    # up right away still gets a 400. Errors further into the body can
+    # only abort the stream.
+    try:
+        first = next(results, b'')
+    except LookupError:
+        return error_response('unknown charset %r' % encoding)
+    except ValueError as e:
+        return error_response(e)
+    return Response(stream_with_context(chain([first], results)), content_type=response_type(encoding))
+
+
+def convert_whole(mode, scheme, encoding, options):
+    # Non-streaming conversion of the whole body, for the alternative schemes
+    started = time.perf_counter()
+    body = request.get_data()
+    try:
+        data = body.decode(encoding)
+        if strict_requested() and mode in VALIDATORS:
+            VALIDATORS[mode](data)
+        result = result_cache.convert(mode, data, scheme, **options).encode(encoding)
+    except LookupError:
+        return error_response('unknown charset %r' % encoding)
+    except ValueError as e:
+        if metrics.enabled:
+            metrics.record_error(mode)
+        return error_response(e)
+    if metrics.enabled:
+        metrics.record_conversion(mode, len(body), len(result), time.perf_counter() - started)
+    return Response(result, content_type=response_type(encoding))
+
+
+def convert_item(item):
+    if not isinstance(item, dict) or not isinstance(item.get('data'), str):
+        return {'error': "each item needs a 'mode' and a string 'data'"}
+    mode = item.get('mode')
+    if not isinstance(mode, str) or mode not in CONVERTERS:
+        return {'error': 'unknown conversion mode %r' % (mode,)}
+    started = time.perf_counter()
+    try:
+        check_input(mode, item['data'])
+        options = text_options(mode, *text_settings(item.get('text_encoding'), item.get('text_errors')))
+        if item.get('strict') and mode in VALIDATORS:
+            VALIDATORS[mode](item['data'])
+        result = result_cache.convert(mode, item['data'], item.get('scheme'), **options)
+    except ValueError as e:
+        if metrics.enabled:
+            metrics.record_error(mode)
+        return {'error': str(e)}
+    if metrics.enabled:
+        metrics.record_conversion(mode, len(item['data']), len(result), time.perf_counter() - started)
+    return {'result': result}
+
+
+# Input and output symbols per unit. With the standard scheme and the
+# legacy text layout every unit converts on its own, so a segment that
+# starts on a unit boundary converts to the matching output span.
+LIVE_UNITS = {
+    'text_to_dna': (1, 4),
+    'text_to_binary': (1, 8),
+    'dna_to_text': (4, 1),
+    'binary_to_text': (8, 1),
+    'dna_to_binary': (1, 2),
+    'binary_to_dna': (2, 1),
+}
+
+
+def _count(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def _is_latin1(text):
+    return text.isascii() or max(text) <= '\xff'
+
+
+def _is_dna(dna):
+    return _is_bases(dna.upper())
+
+
+# What a segment may contain for each unit to convert on its own: text
+# that is one byte per character, bases or bits without spaces
+LIVE_SEGMENT_INPUT = {
+    'text_to_dna': (_is_latin1, 'characters up to U+00FF'),
+    'text_to_binary': (_is_latin1, 'characters up to U+00FF'),
+    'dna_to_text': (_is_dna, 'A, T, G and C without spaces'),
+    'dna_to_binary': (_is_dna, 'A, T, G and C without spaces'),
+    'binary_to_text': (_is_bits, '0 and 1 without spaces'),
+    'binary_to_dna': (_is_bits, '0 and 1 without spaces'),
+}
+
+
+def live_item(mode, item):
+    # As-you-type conversion of one edited segment of a larger input. The
+    # item has the segment as 'data', its input 'offset' and how many old
+    # input symbols it replaces ('replaced', null for the rest of the
+    # input). The answer names the output span to replace: 'offset',
+    # 'length' (null for the rest) and the new 'result', or has an 'error'.
+    # Only the segment is converted, so the cost follows the edit, not the
+    # document. Shared by the Flask and ASGI endpoints.
+    if not isinstance(item, dict) or not isinstance(item.get('data'), str):
+        return {'error': "expected a JSON object with a string 'data'"}
+    offset = item.get('offset', 0)
+    replaced = item.get('replaced')
+    if not _count(offset) or not (replaced is None or _count(replaced)):
+        return {'error': "'offset' and 'replaced' must be non-negative integers"}
+    unit_in, unit_out = LIVE_UNITS[mode]
+    started = time.perf_counter()
+    try:
+        check_input(mode, item['data'])
+        text_encoding, text_errors = text_settings(item.get('text_encoding'), item.get('text_errors'))
+        scheme = get_scheme(item.get('scheme')).name
+        if offset or replaced is not None:
+            # A segment only converts to its span of the output when every
+            # unit in it converts on its own; otherwise send the whole input
+            if scheme != 'standard' or text_encoding != 'legacy':
+                raise ValueError('only the standard scheme with legacy text converts in segments')
+            if offset % unit_in or (replaced or 0) % unit_in:
+                raise ValueError('segments must start and end on whole %d-symbol units' % unit_in)
+            clean, description = LIVE_SEGMENT_INPUT[mode]
+            if not clean(item['data']):
+                raise ValueError('segments may only contain %s, send the whole input instead' % description)
+        result = result_cache.convert(mode, item['data'], scheme, **text_options(mode, text_encoding, text_errors))
+    except ValueError as e:
+        if metrics.enabled:
+            metrics.record_error(mode)
+        return {'error': str(e)}
+    if metrics.enabled:
+        metrics.record_conversion(mode, len(item['data']), len(result), time.perf_counter() - started)
+    return {'offset': offset // unit_in * unit_out,
+            'length': None if replaced is None else replaced // unit_in * unit_out,
+            'result': result}
+
+
+@api.route('/live/<mode>', methods=['POST'])
+def live(mode):
+    if mode not in CONVERTERS:
+        abort(404)
+    reply = live_item(mode, request.get_json(silent=True))
+    return jsonify(reply), 400 if 'error' in reply else 200
+
+
+def iter_ndjson_results(stream):
+    # One JSON object per line, read lazily so a large batch is never held
+    # in memory as a whole
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            yield {'error': 'invalid JSON: %s' % e}
+            continue
+        yield convert_item(item)
+
+
+@api.route('/batch', methods=['POST'])
+def batch():
+    # Convert many {"mode": ..., "data": ...} items in one request. A JSON
+    # array is answered with a JSON array, NDJSON with NDJSON; either way
+    # results are streamed back in input order as {"result": ...} or
+    # {"error": ...}, and one bad item does not fail the others.
+    if request.mimetype in NDJSON_TYPES:
+        def generate():
+            for result in iter_ndjson_results(request.stream):
+                yield json.dumps(result) + '\n'
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    if request.mimetype != 'application/json':
+        return error_response('batch requests must be application/json or application/x-ndjson', 415)
+    items = request.get_json(silent=True)
+    if not isinstance(items, list):
+        return error_response('expected a JSON array of {"mode": ..., "data": ...} items')
+
+    def generate():
+        yield '['
+        for i, result in enumerate(map(convert_item, items)):
+            yield (',' if i else '') + json.dumps(result)
+        yield ']\n'
+    return Response(generate(), mimetype='application/json')
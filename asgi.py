@@ -0,0 +1,359 @@
+import asyncio
+import codecs
+import json
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from api import convert_item, iter_ndjson_results, live_item, text_settings
+from cache import result_cache
+from codec import CONVERTERS, VALIDATORS, text_options
+from limits import BATCH_LIMIT, BODY_OVERHEAD, MODE_LIMITS, client_limiter
+from metrics import metrics
+from schemes import get_scheme
+from stream import incremental_converter
+
+# ASGI entry point serving the /api/v1 convert, live and batch endpoints of
+# the Flask app (background jobs stay with the Flask app), e.g.
+#
+#   uvicorn asgi:app --workers 4
+#
+# Small bodies are converted inline on the event loop. Larger ones are
+# converted chunk by chunk on a bounded thread pool while their output is
+# streamed back, so a slow multi-MB job doesn't hold up small requests.
+# At most MAX_CONCURRENCY large jobs run at once, up to MAX_QUEUE more
+# wait for a slot, and anything beyond that is refused with 503.
+#
+# The size limits and per-client rate limiter of limits.py apply here too:
+# bodies over the limit for their mode are refused with 413 from their
+# Content-Length, or after reading a chunked body up to the limit, and
+# clients over their rate or concurrency limit get 429, before any
+# conversion work.
+
+INLINE_LIMIT = int(os.environ.get('ASGI_INLINE_LIMIT', 64 << 10))
+MAX_CONCURRENCY = int(os.environ.get('ASGI_MAX_CONCURRENCY', os.cpu_count() or 1))
+MAX_QUEUE = int(os.environ.get('ASGI_MAX_QUEUE', 64))
+
+CONVERT_PREFIX = '/api/v1/convert/'
+LIVE_PREFIX = '/api/v1/live/'
+OCTET_STREAM = 'application/octet-stream'
+
+
+class ConversionServer:
+    def __init__(self, inline_limit=INLINE_LIMIT, max_concurrency=MAX_CONCURRENCY, max_queue=MAX_QUEUE):
+        self.inline_limit = inline_limit
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.waiting = 0
+        self._slots = None
+        self._executor = None
+
+    def _start(self):
+        # Created lazily so they bind to the running event loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                thread_name_prefix='convert')
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            self._slots = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        self._start()
+        path = scope['path']
+        if scope['method'] != 'POST':
+            await respond(send, 405, b'Error: method not allowed\n')
+        elif path == '/api/v1/batch':
+            await self._limited(BATCH_LIMIT, self._batch, scope, receive, send)
+        elif path.startswith(CONVERT_PREFIX) and path[len(CONVERT_PREFIX):] in CONVERTERS:
+            mode = path[len(CONVERT_PREFIX):]
+            await self._limited(MODE_LIMITS[mode], self._convert, scope, receive, send, mode)
+        elif path.startswith(LIVE_PREFIX) and path[len(LIVE_PREFIX):] in CONVERTERS:
+            mode = path[len(LIVE_PREFIX):]
+            await self._limited(MODE_LIMITS[mode] * BODY_OVERHEAD, self._live, scope, receive, send, mode)
+        else:
+            await respond(send, 404, b'Error: not found\n')
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self._start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _limited(self, limit, handler, scope, receive, send, *args):
+        length = dict(scope['headers']).get(b'content-length')
+        if length is not None and length.isdigit() and int(length) > limit:
+            await respond(send, 413, too_large(limit), [(b'connection', b'close')])
+            return
+        client = None
+        if client_limiter.enabled:
+            client = (scope.get('client') or ('',))[0]
+            retry = client_limiter.acquire(client)
+            if retry is not None:
+                await respond(send, 429, b'Error: too many requests, retry later\n',
+                              [(b'retry-after', str(math.ceil(retry)).encode())])
+                return
+        try:
+            await handler(*args, scope, receive, send, limit)
+        except BodyTooLarge:
+            await respond(send, 413, too_large(limit), [(b'connection', b'close')])
+        finally:
+            if client is not None:
+                client_limiter.release(client)
+
+    async def _acquire_slot(self, send):
+        # Waits for a pool slot, or answers 503 and returns False when the
+        # queue is full. The caller releases the slot.
+        if self.waiting >= self.max_queue:
+            await respond(send, 503, b'Error: server busy, retry later\n', [(b'retry-after', b'1')])
+            return False
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        return True
+
+    async def _convert(self, mode, scope, receive, send, limit):
+        headers = dict(scope['headers'])
+        mimetype, encoding = content_type(headers)
+        try:
+            ''.encode(encoding)
+        except LookupError:
+            await respond(send, 400, ('Error: unknown charset %r\n' % encoding).encode())
+            return
+        reply_type = OCTET_STREAM if mimetype == OCTET_STREAM else 'text/plain; charset=%s' % encoding
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        strict = query.get('strict', [''])[-1].lower() in ('1', 'true', 'yes')
+        try:
+            text = text_settings(query.get('text_encoding', [''])[-1], query.get('text_errors', [''])[-1])
+            scheme = get_scheme(query.get('scheme', [''])[-1]).name
+        except ValueError as e:
+            await respond(send, 400, ('Error: %s\n' % e).encode())
+            return
+        length = headers.get(b'content-length')
+        if length is None:
+            # Nothing to check up front: read the body up to the limit first,
+            # so an oversized one gets a 413 rather than a truncated 200
+            receive = replay(await read_body(receive, limit))
+        elif length.isdigit() and int(length) <= self.inline_limit:
+            await self._convert_inline(mode, encoding, strict, text, scheme, reply_type, receive, send, limit)
+            return
+
+        if not await self._acquire_slot(send):
+            return
+        try:
+            if scheme == 'standard':
+                await self._convert_offloaded(mode, encoding, strict, text, reply_type, receive, send, limit)
+            else:
+                # Other schemes convert whole bodies, still on the pool
+                await self._convert_inline(mode, encoding, strict, text, scheme, reply_type, receive, send,
+                                           limit, offload=True)
+        finally:
+            self._slots.release()
+
+    async def _convert_inline(self, mode, encoding, strict, text, scheme, reply_type, receive, send,
+                              limit, offload=False):
+        body = await read_body(receive, limit)
+        started = time.perf_counter()
+
+        def run():
+            data = body.decode(encoding)
+            if strict and mode in VALIDATORS:
+                VALIDATORS[mode](data)
+            return result_cache.convert(mode, data, scheme, **text_options(mode, *text)).encode(encoding)
+
+        try:
+            if offload:
+                result = await asyncio.get_running_loop().run_in_executor(self._executor, run)
+            else:
+                result = run()
+        except ValueError as e:
+            if metrics.enabled:
+                metrics.record_error(mode)
+            await respond(send, 400, ('Error: %s\n' % e).encode())
+            return
+        if metrics.enabled:
+            metrics.record_conversion(mode, len(body), len(result), time.perf_counter() - started)
+        await respond(send, 200, result, content_type=reply_type)
+
+    async def _convert_offloaded(self, mode, encoding, strict, text, reply_type, receive, send, limit):
+        # text is the (text_encoding, text_errors) pair from the query string
+        loop = asyncio.get_running_loop()
+        converter = incremental_converter(mode, errors='strict', encoding=encoding, strict=strict,
+                                          text_encoding=text[0], text_errors=text[1])
+
+        # One encoder for the whole response, so a BOM is written only once
+        encoder = codecs.getincrementalencoder(encoding)()
+
+        def step(chunk, final):
+            out = converter.feed(chunk)
+            if final:
+                out += converter.flush()
+            return encoder.encode(out, final)
+
+        started = time.perf_counter()
+        input_size = output_size = 0
+        response_started = False
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            chunk = message.get('body', b'')
+            more_body = message.get('more_body', False)
+            input_size += len(chunk)
+            if input_size > limit:
+                if response_started:
+                    # Too late for a status code, abort the stream instead
+                    raise ValueError('request body too large')
+                raise BodyTooLarge()
+            try:
+                out = await loop.run_in_executor(self._executor, step, chunk, not more_body)
+            except ValueError as e:
+                if metrics.enabled:
+                    metrics.record_error(mode)
+                if response_started:
+                    # Too late for a status code, abort the stream instead
+                    raise
+                await respond(send, 400, ('Error: %s\n' % e).encode())
+                return
+            if not response_started:
+                await send({'type': 'http.response.start', 'status': 200,
+                            'headers': [(b'content-type', reply_type.encode())]})
+                response_started = True
+            if out or not more_body:
+                output_size += len(out)
+                await send({'type': 'http.response.body', 'body': out, 'more_body': more_body})
+        if metrics.enabled:
+            metrics.record_conversion(mode, input_size, output_size, time.perf_counter() - started)
+
+    async def _live(self, mode, scope, receive, send, limit):
+        # Same contract as the Flask endpoint. Keystroke-sized segments run
+        # inline; a full input above the inline limit takes a pool slot.
+        body = await read_body(receive, limit)
+        try:
+            item = json.loads(body)
+        except ValueError:
+            item = None
+        if len(body) <= self.inline_limit:
+            reply = live_item(mode, item)
+        else:
+            if not await self._acquire_slot(send):
+                return
+            try:
+                reply = await asyncio.get_running_loop().run_in_executor(self._executor, live_item, mode, item)
+            finally:
+                self._slots.release()
+        await respond(send, 400 if 'error' in reply else 200, (json.dumps(reply) + '\n').encode(),
+                      content_type='application/json')
+
+    async def _batch(self, scope, receive, send, limit):
+        # Same contract as the Flask endpoint: JSON array or NDJSON in,
+        # the same format out. The whole batch runs on the pool and takes
+        # a slot like a large conversion.
+        mimetype, _ = content_type(dict(scope['headers']))
+        if not await self._acquire_slot(send):
+            return
+        try:
+            await self._run_batch(mimetype, receive, send, limit)
+        finally:
+            self._slots.release()
+
+    async def _run_batch(self, mimetype, receive, send, limit):
+        body = await read_body(receive, limit)
+        loop = asyncio.get_running_loop()
+        if mimetype in ('application/x-ndjson', 'application/jsonl'):
+            def run():
+                return ''.join(json.dumps(result) + '\n' for result in iter_ndjson_results(body.splitlines())).encode()
+            reply_type = 'application/x-ndjson'
+        elif mimetype == 'application/json':
+            try:
+                items = json.loads(body)
+            except ValueError:
+                items = None
+            if not isinstance(items, list):
+                await respond(send, 400, b'Error: expected a JSON array of {"mode": ..., "data": ...} items\n')
+                return
+
+            def run():
+                return (json.dumps([convert_item(item) for item in items]) + '\n').encode()
+            reply_type = 'application/json'
+        else:
+            await respond(send, 415, b'Error: batch requests must be application/json or application/x-ndjson\n')
+            return
+        await respond(send, 200, await loop.run_in_executor(self._executor, run), content_type=reply_type)
+
+
+class BodyTooLarge(Exception):
+    pass
+
+
+def too_large(limit):
+    return ('Error: request body too large, the limit is %d bytes\n' % limit).encode()
+
+
+def content_type(headers):
+    # Returns (mimetype, charset) like Flask's request.mimetype/charset
+    value = headers.get(b'content-type', b'').decode('latin-1')
+    mimetype, _, params = value.partition(';')
+    mimetype = mimetype.strip().lower()
+    if mimetype == OCTET_STREAM:
+        return mimetype, 'latin-1'
+    charset = 'utf-8'
+    for param in params.split(';'):
+        key, _, val = param.partition('=')
+        if key.strip().lower() == 'charset' and val.strip():
+            charset = val.strip().strip('"')
+    return mimetype, charset
+
+
+async def read_body(receive, limit=None):
+    parts = []
+    size = 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        parts.append(message.get('body', b''))
+        size += len(parts[-1])
+        if limit is not None and size > limit:
+            raise BodyTooLarge()
+        more_body = message.get('more_body', False)
+    return b''.join(parts)
+
+
+def replay(body):
+    # A receive() that hands over an already read body in one message
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+    return receive
+
+
+async def respond(send, status, body, headers=(), content_type='text/plain; charset=utf-8'):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', content_type.encode()),
+                    (b'content-length', str(len(body)).encode()), *headers],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+app = ConversionServer()
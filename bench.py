@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import codec
+from codec import CONVERTERS, bytes_to_dna
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Benchmark for the six conversion modes, e.g.
+#
+#   python -m bench --sizes 1K,1M,64M --backend python --backend numpy
+#   python -m bench --save baseline.json
+#   python -m bench --baseline baseline.json --threshold 0.15
+#
+# Prints a JSON report with throughput (input MB/s), latency percentiles
+# and peak memory per backend, mode and input size. With --baseline the
+# run fails when any case is slower than the saved one by more than the
+# threshold.
+
+DEFAULT_SIZES = '1K,64K,1M,16M'
+_UNITS = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+
+def parse_size(text):
+    text = text.strip().upper().rstrip('B')
+    unit = text[-1:] if text[-1:] in _UNITS else ''
+    return int(text[:len(text) - len(unit)]) * _UNITS[unit]
+
+
+def format_size(size):
+    for unit in ('G', 'M', 'K'):
+        if size >= _UNITS[unit] and size % _UNITS[unit] == 0:
+            return '%d%s' % (size // _UNITS[unit], unit)
+    return str(size)
+
+
+def make_input(mode, size):
+    # size input characters of clean data for the mode
+    if mode.startswith('text_'):
+        return os.urandom(size).decode('latin-1')
+    if mode.startswith('dna_'):
+        return bytes_to_dna(os.urandom(-(-size // 4)))[:size]
+    return codec.text_to_binary(os.urandom(-(-size // 8)).decode('latin-1'))[:size]
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def peak_rss():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_case(mode, data, repeat, min_time):
+    convert = CONVERTERS[mode]
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < repeat or (time.perf_counter() - started < min_time and len(timings) < 1000):
+        t0 = time.perf_counter()
+        convert(data)
+        timings.append(time.perf_counter() - t0)
+    # One extra traced run for the peak allocation, kept out of the timings
+    tracemalloc.start()
+    convert(data)
+    peak_alloc = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'runs': len(timings),
+        'throughput_mb_s': round(len(data) / timings[len(timings) // 2] / 1e6, 3),
+        'latency_ms': {
+            'min': round(timings[0] * 1e3, 4),
+            'p50': round(percentile(timings, 0.50) * 1e3, 4),
+            'p90': round(percentile(timings, 0.90) * 1e3, 4),
+            'p99': round(percentile(timings, 0.99) * 1e3, 4),
+            'max': round(timings[-1] * 1e3, 4),
+        },
+        'peak_alloc_bytes': peak_alloc,
+    }
+
+
+def run(modes, sizes, backends, repeat=5, min_time=0.2):
+    results = []
+    previous = codec.get_backend()
+    try:
+        for mode in modes:
+            for size in sizes:
+                data = make_input(mode, size)
+                for backend in backends:
+                    codec.set_backend(backend)
+                    result = {'backend': backend, 'mode': mode, 'size': format_size(size)}
+                    result.update(run_case(mode, data, repeat, min_time))
+                    results.append(result)
+                del data
+    finally:
+        codec.set_backend(previous)
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+        'peak_rss_bytes': peak_rss(),
+    }
+
+
+def compare(report, baseline, threshold):
+    # Returns one message per case that got slower than the baseline
+    saved = {(r['backend'], r['mode'], r['size']): r for r in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        old = saved.get((result['backend'], result['mode'], result['size']))
+        if old is None or not old['throughput_mb_s']:
+            continue
+        change = result['throughput_mb_s'] / old['throughput_mb_s'] - 1
+        result['baseline_change'] = round(change, 4)
+        if change < -threshold:
+            regressions.append('%s %s %s: %.1f MB/s vs %.1f MB/s baseline (%+.0f%%)' % (
+                result['backend'], result['mode'], result['size'],
+                result['throughput_mb_s'], old['throughput_mb_s'], change * 100))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m bench', description='Benchmark the conversion modes.')
+    parser.add_argument('--mode', action='append', choices=sorted(CONVERTERS), dest='modes',
+                        help='mode to run, repeatable (default: all six)')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help='comma separated input sizes, e.g. 1K,1M,1G (default: %(default)s)')
+    parser.add_argument('--backend', action='append', choices=sorted(codec.backends), dest='backends',
+                        help='backend to run, repeatable (default: the active one)')
+    parser.add_argument('--repeat', type=int, default=5, help='minimum runs per case (default: %(default)s)')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='keep repeating a case until this many seconds (default: %(default)s)')
+    parser.add_argument('--save', metavar='FILE', help='write the report to FILE, e.g. as a baseline')
+    parser.add_argument('--baseline', metavar='FILE', help='compare against a saved report')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='allowed throughput drop against the baseline (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    modes = args.modes or list(CONVERTERS)
+    sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    backends = args.backends or [codec.get_backend()]
+    report = run(modes, sizes, backends, args.repeat, args.min_time)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        report['regressions'] = regressions
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    for message in regressions:
+        print('Regression: ' + message, file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
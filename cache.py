@@ -0,0 +1,107 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from codec import PackedDNA
+from schemes import get_scheme
+
+# Bounded LRU cache of conversion results. Entries are keyed by mode and a
+# hash of the input, so the input itself is never kept, and the bound is
+# on the total size of the cached results rather than on their number.
+
+
+class ResultCache:
+    # Rough per-entry cost of the key, the dict slot and the str header
+    ENTRY_OVERHEAD = 128
+
+    def __init__(self, max_bytes=64 << 20, max_entry_bytes=1 << 20):
+        # Results larger than max_entry_bytes bypass the cache, so one huge
+        # payload can't push out everything else
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypassed = 0
+
+    @staticmethod
+    def key(mode, data, options=()):
+        if isinstance(data, PackedDNA):
+            # The packed bytes, under their own personalization so they
+            # never share a digest with a str input
+            digest = hashlib.blake2b(data.memoryview(), digest_size=16, person=b'packed').digest()
+        else:
+            digest = hashlib.blake2b(data.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        return mode, tuple(options), len(data), digest
+
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def _bypass(self):
+        with self._lock:
+            self.bypassed += 1
+
+    def put(self, key, result):
+        cost = len(result) + self.ENTRY_OVERHEAD
+        if cost > self.max_entry_bytes:
+            self._bypass()
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old) + self.ENTRY_OVERHEAD
+            self._entries[key] = result
+            self.size += cost
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted) + self.ENTRY_OVERHEAD
+                self.evictions += 1
+
+    def convert(self, mode, data, scheme=None, **options):
+        # Same as CONVERTERS[mode](data, **options), or the named scheme's
+        # converter, served from the cache when possible. No mode shrinks
+        # its input more than 8x, so inputs beyond that can't give a
+        # cacheable result and skip hashing as well.
+        scheme = get_scheme(scheme)
+        converter = scheme.converters[mode]
+        if len(data) > self.max_entry_bytes * 8:
+            self._bypass()
+            return converter(data, **options)
+        key = self.key(mode, data, [('scheme', scheme.name)] + sorted(options.items()))
+        result = self.get(key)
+        if result is None:
+            result = converter(data, **options)
+            self.put(key, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self.size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'bypassed': self.bypassed,
+        }
+
+
+result_cache = ResultCache()
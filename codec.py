@@ -0,0 +1,527 @@
+import re
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the pure Python backend covers everything
+    np = None
+
+binary_to_dna = {'00': 'A', '01': 'T', '10': 'G', '11': 'C'}
+dna_to_binary = {v: k for k, v in binary_to_dna.items()}
+
+# Every conversion below is table driven and linear in the input size.
+# Clean input ('0'/'1' only, or A/T/G/C only) goes through the selected
+# backend; anything else falls back to per-symbol tables that reproduce
+# the '?' / '??' markers exactly.
+
+# Byte value -> its 4 bases, as ASCII bytes
+_BYTE_DNA = [
+    ''.join(binary_to_dna[format(i, '08b')[j:j + 2]] for j in range(0, 8, 2)).encode('ascii')
+    for i in range(256)
+]
+# Base letter -> base-4 digit, used to read a DNA string as one big integer
+_DNA_DIGITS = bytes.maketrans(b'ATGC', b'0123')
+
+
+class _DnaBits(dict):
+    # str.translate table: every character that is not a base becomes '??'
+    def __missing__(self, key):
+        return '??'
+
+
+_DNA_BITS = _DnaBits({ord(base): bits for base, bits in dna_to_binary.items()})
+
+
+class _PythonBackend:
+    # Big-int base conversion and bytes tables, all running in C loops.
+    # Every kernel takes and returns ASCII bytes and expects clean input.
+    name = 'python'
+
+    @staticmethod
+    def encode(data):
+        return b''.join(map(_BYTE_DNA.__getitem__, data))
+
+    @staticmethod
+    def decode(bases):
+        # len(bases) must be a multiple of 4
+        if not bases:
+            return b''
+        return int(bases.translate(_DNA_DIGITS), 4).to_bytes(len(bases) // 4, 'big')
+
+    @staticmethod
+    def bits_to_bases(bits):
+        # len(bits) must be even. Left-pad to whole bytes, encode them 4
+        # bases at a time, then drop the 'A's that the padding produced
+        if not bits:
+            return b''
+        pad = -len(bits) % 8
+        data = int(bits, 2).to_bytes((len(bits) + pad) // 8, 'big')
+        return _PythonBackend.encode(data)[pad // 2:]
+
+    @staticmethod
+    def bases_to_bits(bases):
+        if not bases:
+            return b''
+        # A/T/G/C are the base-4 digits 0-3, so the whole sequence is one number
+        value = int(bases.translate(_DNA_DIGITS), 4)
+        return format(value, '0%db' % (len(bases) * 2)).encode('ascii')
+
+    @staticmethod
+    def bytes_to_bits(data):
+        if not data:
+            return b''
+        return format(int.from_bytes(data, 'big'), '0%db' % (len(data) * 8)).encode('ascii')
+
+    @staticmethod
+    def bits_to_bytes(bits):
+        # len(bits) must be a multiple of 8
+        if not bits:
+            return b''
+        return int(bits, 2).to_bytes(len(bits) // 8, 'big')
+
+
+class _NumpyBackend:
+    # Same kernels, vectorized as lookups into uint8/16/32 tables so each
+    # output element is a single np.take; tobytes() restores the layout
+    name = 'numpy'
+
+    if np is not None:
+        # Byte value -> its 4 bases packed in one uint32
+        _QUADS = np.frombuffer(b''.join(_BYTE_DNA), dtype=np.uint32)
+        # ASCII code of a base -> its two bit characters packed in one uint16
+        _PAIRS = np.zeros(256, dtype=np.uint16)
+        # Two bit characters read as one uint16 -> base letter
+        _PAIR_BASES = np.zeros(65536, dtype=np.uint8)
+        for _bits, _base in binary_to_dna.items():
+            _pair = np.frombuffer(_bits.encode('ascii'), dtype=np.uint16)[0]
+            _PAIRS[ord(_base)] = _pair
+            _PAIR_BASES[_pair] = ord(_base)
+        del _bits, _base, _pair
+        # Two base letters read as one uint16 -> their 4 bits
+        _NIBBLES = np.zeros(65536, dtype=np.uint8)
+        for _high in range(4):
+            for _low in range(4):
+                _pair = np.frombuffer(b'ATGC'[_high:_high + 1] + b'ATGC'[_low:_low + 1], dtype=np.uint16)[0]
+                _NIBBLES[_pair] = _high << 2 | _low
+        del _high, _low, _pair
+
+    @staticmethod
+    def encode(data):
+        return np.take(_NumpyBackend._QUADS, np.frombuffer(data, dtype=np.uint8)).tobytes()
+
+    @staticmethod
+    def decode(bases):
+        # len(bases) must be a multiple of 4. One lookup per base pair,
+        # then each byte joins two nibbles
+        nibbles = np.take(_NumpyBackend._NIBBLES, np.frombuffer(bases, dtype=np.uint16)).reshape(-1, 2)
+        return ((nibbles[:, 0] << 4) | nibbles[:, 1]).tobytes()
+
+    @staticmethod
+    def bits_to_bases(bits):
+        # len(bits) must be even
+        return np.take(_NumpyBackend._PAIR_BASES, np.frombuffer(bits, dtype=np.uint16)).tobytes()
+
+    @staticmethod
+    def bases_to_bits(bases):
+        return np.take(_NumpyBackend._PAIRS, np.frombuffer(bases, dtype=np.uint8)).tobytes()
+
+    @staticmethod
+    def bytes_to_bits(data):
+        return (np.unpackbits(np.frombuffer(data, dtype=np.uint8)) + ord('0')).tobytes()
+
+    @staticmethod
+    def bits_to_bytes(bits):
+        # len(bits) must be a multiple of 8
+        return np.packbits(np.frombuffer(bits, dtype=np.uint8) - ord('0')).tobytes()
+
+
+backends = {'python': _PythonBackend}
+if np is not None:
+    backends['numpy'] = _NumpyBackend
+
+_backend = backends['numpy' if np is not None else 'python']
+
+
+def get_backend():
+    return _backend.name
+
+
+def set_backend(name):
+    # Switch the kernels used for clean input, e.g. to compare backends
+    global _backend
+    if name not in backends:
+        raise ValueError('unknown backend %r, available: %s' % (name, ', '.join(backends)))
+    _backend = backends[name]
+
+
+def _is_bits(binary):
+    return binary.isascii() and not binary.encode('ascii').translate(None, b'01')
+
+
+def _is_bases(dna):
+    return dna.isascii() and not dna.encode('ascii').translate(None, b'ATGC')
+
+
+def normalize_dna(dna):
+    return dna.upper().replace(' ', '')
+
+
+class PackedDNA:
+    # A DNA sequence stored 2 bits per base, 4 bases per byte, using the
+    # same A=00 T=01 G=10 C=11 layout as the text encoding. The packed
+    # bytes of an encoded text are therefore the text's bytes themselves.
+    # Unused low bits of the last byte are always zero.
+    __slots__ = ('_data', '_length')
+
+    def __init__(self, dna=''):
+        dna = normalize_dna(dna)
+        if not _is_bases(dna):
+            raise ValueError('invalid DNA sequence, expected only A, T, G and C')
+        self._length = len(dna)
+        self._data = bytearray(_backend.decode((dna + 'A' * (-len(dna) % 4)).encode('ascii')))
+
+    @classmethod
+    def from_bytes(cls, data, length=None):
+        # Wrap already packed bytes, e.g. raw file content, without converting
+        self = cls.__new__(cls)
+        self._data = bytearray(data)
+        self._length = len(data) * 4 if length is None else length
+        if not 0 <= self._length <= len(data) * 4:
+            raise ValueError('length out of range for %d packed bytes' % len(data))
+        self._clear_padding()
+        return self
+
+    @classmethod
+    def from_bits(cls, bits):
+        # bits must be clean and of even length
+        pad = -len(bits) % 8
+        return cls.from_bytes(_backend.bits_to_bytes((bits + '0' * pad).encode('ascii')), len(bits) // 2)
+
+    def _clear_padding(self):
+        del self._data[(self._length + 3) // 4:]
+        spare = -self._length % 4
+        if spare:
+            self._data[-1] &= 0xFF << (2 * spare) & 0xFF
+
+    def to_bytes(self):
+        # Whole bytes only, a trailing partial quad is dropped like dna_to_bytes
+        return bytes(self._data[:self._length // 4])
+
+    def memoryview(self):
+        # Read-only, zero-copy view of the packed bytes
+        return memoryview(self._data).toreadonly()
+
+    def __buffer__(self, flags):
+        return self.memoryview()
+
+    def __len__(self):
+        return self._length
+
+    def __str__(self):
+        return _backend.encode(self._data)[:self._length].decode('ascii')
+
+    def __repr__(self):
+        text = str(self[:32])
+        if self._length > 32:
+            text += '...'
+        return '%s(%r, length=%d)' % (type(self).__name__, text, self._length)
+
+    def __iter__(self):
+        remaining = self._length
+        for byte in self._data:
+            bases = _BYTE_BASES[byte]
+            if remaining < 4:
+                yield from bases[:remaining]
+                return
+            yield from bases
+            remaining -= 4
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                return type(self)(str(self)[index])
+            return self._slice(start, max(start, stop))
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('PackedDNA index out of range')
+        return 'ATGC'[self._data[index // 4] >> (6 - 2 * (index % 4)) & 3]
+
+    def _slice(self, start, stop):
+        length = stop - start
+        first, last = start // 4, (stop + 3) // 4
+        if start % 4 == 0:
+            return type(self).from_bytes(self._data[first:last], length)
+        # Realign through one big integer: drop the bases past stop, keep
+        # length bases and shift them back to the top of the first byte
+        value = int.from_bytes(self._data[first:last], 'big') >> (2 * (last * 4 - stop))
+        value &= (1 << 2 * length) - 1
+        pad = -length % 4
+        return type(self).from_bytes((value << 2 * pad).to_bytes((length + pad) // 4, 'big'), length)
+
+    def __eq__(self, other):
+        if isinstance(other, PackedDNA):
+            return self._length == other._length and self._data == other._data
+        if isinstance(other, str):
+            return len(other) == self._length and str(self) == other
+        return NotImplemented
+
+    __hash__ = None
+
+
+_BYTE_BASES = [bases.decode('ascii') for bases in _BYTE_DNA]
+# Reverse complement (A<->T, G<->C) of the 4 bases in a packed byte: the
+# complement flips the low bit of every base, then the bases are reversed
+_REVCOMP_BYTE = bytes(
+    sum(((i ^ 0x55) >> shift & 3) << (6 - shift) for shift in (0, 2, 4, 6)) for i in range(256)
+)
+_COMPLEMENT = str.maketrans('ATGCatgc', 'TACGtacg')
+
+
+def reverse_complement(dna):
+    # str in, str out (other characters are kept as they are), or PackedDNA
+    # in, PackedDNA out without unpacking
+    if not isinstance(dna, PackedDNA):
+        return dna[::-1].translate(_COMPLEMENT)
+    data = dna.memoryview()
+    result = PackedDNA.from_bytes(bytes(data[::-1]).translate(_REVCOMP_BYTE), len(data) * 4)
+    # The zero padding of the last byte is now at the front
+    return result[-len(dna) % 4:] if len(dna) % 4 else result
+
+
+def bytes_to_dna(data, packed=False):
+    # Each byte becomes 4 bases straight from the table, no '0'/'1' string
+    if packed:
+        return PackedDNA.from_bytes(data)
+    return _backend.encode(data).decode('ascii')
+
+
+def dna_to_bytes(dna):
+    # Every 4 bases are one byte; a trailing partial quad is dropped
+    if isinstance(dna, PackedDNA):
+        return dna.to_bytes()
+    dna = normalize_dna(dna)
+    if not _is_bases(dna):
+        raise ValueError('invalid DNA sequence, expected only A, T, G and C')
+    return _clean_dna_to_bytes(dna)
+
+
+def _clean_dna_to_bytes(dna):
+    # dna_to_bytes for input that is already normalized and checked
+    dna = dna[:len(dna) - (len(dna) % 4)]
+    return _backend.decode(dna.encode('ascii'))
+
+
+def bytes_to_binary(data):
+    return _backend.bytes_to_bits(data).decode('ascii')
+
+
+def binary_to_bytes(binary):
+    # Every 8 bits are one byte; extra trailing bits are dropped
+    binary = binary[:len(binary) - (len(binary) % 8)]
+    if not _is_bits(binary):
+        raise ValueError('invalid binary, expected only 0 and 1')
+    return _backend.bits_to_bytes(binary.encode('ascii'))
+
+
+# The text converters take an optional encoding. Without one, each
+# character is written as its code point in 8 bits, or more above 255,
+# which is the original layout but can't round trip such characters.
+# With one (e.g. 'utf-8'), text goes through str.encode/bytes.decode and
+# the byte tables, which is lossless for all of Unicode; errors is the
+# decode error policy ('strict', 'replace', 'ignore', ...).
+
+def text_to_binary(text, encoding=None):
+    if encoding is not None:
+        return bytes_to_binary(text.encode(encoding))
+    try:
+        data = text.encode('latin-1')
+    except UnicodeEncodeError:
+        # Code points above 255 take more than 8 bits, keep the old layout
+        return ''.join(format(ord(char), '08b') for char in text)
+    return bytes_to_binary(data)
+
+
+def binary_to_text(binary, encoding=None, errors='strict'):
+    if encoding is not None:
+        return binary_to_bytes(binary).decode(encoding, errors)
+    # Ensure binary length is multiple of 8 by removing extra bits
+    binary = binary[:len(binary) - (len(binary) % 8)]
+    if _is_bits(binary):
+        return _backend.bits_to_bytes(binary.encode('ascii')).decode('latin-1')
+    chars = [binary[i:i+8] for i in range(0, len(binary), 8)]
+    return ''.join(chr(int(b, 2)) for b in chars if len(b) == 8)
+
+
+def binary_to_dna_seq(binary, packed=False):
+    # Remove any spaces and ensure even length
+    binary = binary.replace(' ', '')
+    if len(binary) % 2 != 0:
+        binary = binary[:-1]  # Remove last bit to make even
+    if not _is_bits(binary):
+        if packed:
+            raise ValueError('invalid binary, only 0 and 1 can be packed')
+        return ''.join(binary_to_dna.get(binary[i:i+2], '?') for i in range(0, len(binary), 2))
+    if packed:
+        return PackedDNA.from_bits(binary)
+    return _backend.bits_to_bases(binary.encode('ascii')).decode('ascii')
+
+
+def dna_to_binary_seq(dna):
+    if isinstance(dna, PackedDNA):
+        return _backend.bytes_to_bits(dna.memoryview()).decode('ascii')[:len(dna) * 2]
+    # Remove any spaces and convert to uppercase
+    dna = normalize_dna(dna)
+    if not _is_bases(dna):
+        return dna.translate(_DNA_BITS)
+    return _backend.bases_to_bits(dna.encode('ascii')).decode('ascii')
+
+
+def text_to_dna(text, packed=False, encoding=None):
+    if encoding is not None:
+        return bytes_to_dna(text.encode(encoding), packed)
+    try:
+        data = text.encode('latin-1')
+    except UnicodeEncodeError:
+        binary = text_to_binary(text)
+        return binary_to_dna_seq(binary, packed)
+    return bytes_to_dna(data, packed)
+
+
+def dna_to_text(dna, encoding=None, errors='strict'):
+    if encoding is not None:
+        return dna_to_bytes(dna).decode(encoding, errors)
+    if isinstance(dna, PackedDNA):
+        return dna.to_bytes().decode('latin-1')
+    dna = normalize_dna(dna)
+    if _is_bases(dna):
+        return _clean_dna_to_bytes(dna).decode('latin-1')
+    binary = dna_to_binary_seq(dna)
+    return binary_to_text(binary)
+
+
+# Random access: every byte is exactly 4 bases, so bytes start:stop of the
+# decoded data are bases 4 * start to 4 * stop and nothing else has to be
+# read. The source can be a DNA string, a buffer of ASCII DNA such as an
+# mmap of a .dna file (offsets count bases, so the file must not contain
+# line breaks), a PackedDNA, a buffer of packed bytes with packed=True, or
+# anything with len() in bases and read_bytes(start, stop) like a
+# container.ContainerReader.
+
+def dna_slice_to_bytes(source, start=0, stop=None, packed=False):
+    if isinstance(source, PackedDNA):
+        start, stop, _ = slice(start, stop).indices(len(source) // 4)
+        return bytes(source.memoryview()[start:max(start, stop)])
+    if packed:
+        start, stop, _ = slice(start, stop).indices(len(source))
+        return bytes(memoryview(source)[start:max(start, stop)])
+    start, stop, _ = slice(start, stop).indices(len(source) // 4)
+    stop = max(start, stop)
+    if hasattr(source, 'read_bytes'):
+        return source.read_bytes(start, stop)
+    dna = source[4 * start:4 * stop]
+    if not isinstance(dna, str):
+        dna = bytes(dna).decode('ascii')
+    return dna_to_bytes(dna)
+
+
+def dna_slice_to_text(source, start=0, stop=None, encoding=None, errors='strict', packed=False):
+    # start and stop count bytes, which are characters for the default
+    # one-byte layout. With a multi-byte encoding a range that cuts through
+    # a character is handled by the errors policy, e.g. 'replace' or 'ignore'.
+    return dna_slice_to_bytes(source, start, stop, packed).decode(encoding or 'latin-1', errors)
+
+
+# Conversion mode name (as used by the web form) -> converter
+CONVERTERS = {
+    'text_to_dna': text_to_dna,
+    'dna_to_text': dna_to_text,
+    'binary_to_dna': binary_to_dna_seq,
+    'dna_to_binary': dna_to_binary_seq,
+    'text_to_binary': text_to_binary,
+    'binary_to_text': binary_to_text,
+}
+
+
+class InvalidInputError(ValueError):
+    def __init__(self, kind, position, count, symbol):
+        self.kind = kind
+        self.position = position
+        self.count = count
+        self.symbol = symbol
+        super().__init__('invalid %s symbol %r at offset %d (%d invalid symbol%s in total)'
+                         % (kind, symbol, position, count, '' if count == 1 else 's'))
+
+
+# Symbols each input may contain. Spaces are only valid where the
+# converter strips them: in DNA and in binary_to_dna input, but not in
+# binary_to_text, which reads the bits 8 at a time as they are.
+_VALID = {'DNA': 'ATGCatgc ', 'binary': '01 ', 'bits': '01'}
+_KIND = {'bits': 'binary'}
+_VALID_BYTES = {kind: symbols.encode('ascii') for kind, symbols in _VALID.items()}
+_DROP_VALID = {kind: dict.fromkeys(map(ord, symbols)) for kind, symbols in _VALID.items()}
+_FIRST_INVALID = {kind: re.compile('[^%s]' % re.escape(symbols)) for kind, symbols in _VALID.items()}
+
+
+def _validate(kind, data, offset):
+    # One translate() pass counts the bad symbols; only when there are any
+    # does a regex search find the first one
+    if data.isascii():
+        count = len(data.encode('ascii').translate(None, _VALID_BYTES[kind]))
+    else:
+        count = len(data.translate(_DROP_VALID[kind]))
+    if count:
+        match = _FIRST_INVALID[kind].search(data)
+        raise InvalidInputError(_KIND.get(kind, kind), offset + match.start(), count, match.group())
+
+
+def validate_dna(dna, offset=0):
+    # offset is added to reported positions, e.g. for chunked input
+    _validate('DNA', dna, offset)
+
+
+def validate_binary(binary, offset=0, spaces=True):
+    # spaces=False for binary_to_text, which does not strip them
+    _validate('binary' if spaces else 'bits', binary, offset)
+
+
+def _validate_bits(binary, offset=0):
+    validate_binary(binary, offset, spaces=False)
+
+
+# Modes that read or produce text and so take the encoding options
+TEXT_INPUT = ('text_to_dna', 'text_to_binary')
+TEXT_OUTPUT = ('dna_to_text', 'binary_to_text')
+TEXT_ENCODINGS = ('legacy', 'utf-8', 'utf-16', 'latin-1')
+TEXT_ERRORS = ('strict', 'replace', 'ignore', 'backslashreplace')
+
+
+# Validator for each mode that reads a DNA or binary sequence
+VALIDATORS = {
+    'dna_to_text': validate_dna,
+    'dna_to_binary': validate_dna,
+    'binary_to_dna': validate_binary,
+    'binary_to_text': _validate_bits,
+}
+
+
+def text_options(mode, encoding=None, errors='strict'):
+    # Keyword arguments for CONVERTERS[mode]; encoding None or 'legacy'
+    # keeps the code point layout
+    if encoding in (None, 'legacy'):
+        return {}
+    if mode in TEXT_INPUT:
+        return {'encoding': encoding}
+    if mode in TEXT_OUTPUT:
+        return {'encoding': encoding, 'errors': errors}
+    return {}
+
+
+def convert(mode, data, strict=False, encoding=None, errors='strict'):
+    # With strict, invalid input is rejected up front with the position of
+    # the first bad symbol, instead of being turned into '?' markers or
+    # failing partway through the conversion
+    if strict and mode in VALIDATORS and not isinstance(data, PackedDNA):
+        # A PackedDNA only holds valid bases
+        VALIDATORS[mode](data)
+    return CONVERTERS[mode](data, **text_options(mode, encoding, errors))
@@ -0,0 +1,278 @@
+import argparse
+import os
+import struct
+import sys
+import zlib
+from io import BytesIO
+
+try:
+    import lzma
+except ImportError:  # Some Python builds ship without it
+    lzma = None
+
+from codec import PackedDNA, dna_to_bytes, normalize_dna
+from convert import iter_blocks, strip_sequence_layout
+
+# Compact on-disk container for encoded DNA, e.g.
+#
+#   python -m container pack archive.dna archive.dnac --compression lzma
+#   python -m container unpack archive.dnac archive.dna --start 4000 --stop 8000
+#
+# Bases are stored 2 bits each (A=00 T=01 G=10 C=11, as in PackedDNA) in
+# fixed-size blocks, each optionally compressed on its own. A block index
+# in the footer gives every block's file offset, so reading a base range
+# only seeks to and decompresses the blocks that cover it.
+#
+#   header   'DNAC', version, compression, block size in bases
+#   blocks   packed (and maybe compressed) bases, the last one may be short
+#   index    (offset, stored size) per block
+#   footer   total bases, index offset, block count, 'DNAX'
+
+MAGIC = b'DNAC'
+FOOTER_MAGIC = b'DNAX'
+VERSION = 1
+# 1M bases = 256 KiB packed per block
+BLOCK_BASES = 1 << 20
+
+_HEADER = struct.Struct('<4sBBxxI')
+_INDEX_ENTRY = struct.Struct('<QI')
+_FOOTER = struct.Struct('<QQI4s')
+
+# name -> (id, compress, decompress)
+COMPRESSIONS = {
+    'none': (0, bytes, bytes),
+    'zlib': (1, zlib.compress, zlib.decompress),
+}
+if lzma is not None:
+    COMPRESSIONS['lzma'] = (2, lzma.compress, lzma.decompress)
+_BY_ID = {entry[0]: (name,) + entry[1:] for name, entry in COMPRESSIONS.items()}
+
+
+class ContainerError(ValueError):
+    pass
+
+
+class ContainerWriter:
+    # Takes DNA in any number of write() calls, so a sequence can be packed
+    # straight from a streaming converter without holding it in memory.
+    def __init__(self, fileobj, compression='zlib', block_bases=BLOCK_BASES):
+        if compression not in COMPRESSIONS:
+            raise ValueError('unknown compression %r, available: %s' % (compression, ', '.join(COMPRESSIONS)))
+        if block_bases <= 0 or block_bases % 4:
+            raise ValueError('block size must be a positive multiple of 4 bases')
+        self._file = fileobj
+        self._compression_id, self._compress, _ = COMPRESSIONS[compression]
+        self.block_bases = block_bases
+        self._block_bytes = block_bases // 4
+        # Whole packed bytes not yet written, and up to 3 bases short of a byte
+        self._buffer = bytearray()
+        self._partial = ''
+        self._index = []
+        self._offset = self._file.write(_HEADER.pack(MAGIC, VERSION, self._compression_id, block_bases))
+        self.length = 0
+        self.closed = False
+
+    def write(self, dna):
+        if isinstance(dna, PackedDNA):
+            dna = str(dna)
+        dna = self._partial + normalize_dna(dna)
+        whole = len(dna) - len(dna) % 4
+        self._buffer += dna_to_bytes(dna[:whole])
+        self._partial = dna[whole:]
+        self.length += whole
+        self._write_full_blocks()
+
+    def write_bytes(self, data):
+        # Already packed bytes, e.g. the raw input of text_to_dna: 4 bases
+        # per byte with no conversion at all
+        if self._partial:
+            self.write(str(PackedDNA.from_bytes(data)))
+            return
+        self._buffer += data
+        self.length += len(data) * 4
+        self._write_full_blocks()
+
+    def _write_full_blocks(self):
+        size = self._block_bytes
+        if len(self._buffer) < size:
+            return
+        end = len(self._buffer) - len(self._buffer) % size
+        view = memoryview(self._buffer)
+        for start in range(0, end, size):
+            self._write_block(view[start:start + size])
+        view.release()
+        del self._buffer[:end]
+
+    def _write_block(self, data):
+        stored = self._compress(data)
+        self._file.write(stored)
+        self._index.append((self._offset, len(stored)))
+        self._offset += len(stored)
+
+    def close(self):
+        if self.closed:
+            return
+        if self._partial:
+            self._buffer += PackedDNA(self._partial).memoryview()
+            self.length += len(self._partial)
+            self._partial = ''
+        if self._buffer:
+            self._write_block(bytes(self._buffer))
+            self._buffer.clear()
+        index_offset = self._offset
+        self._file.write(b''.join(_INDEX_ENTRY.pack(*entry) for entry in self._index))
+        self._file.write(_FOOTER.pack(self.length, index_offset, len(self._index), FOOTER_MAGIC))
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ContainerReader:
+    # Random access to the bases of a container. Only the header, footer
+    # and index are read up front; blocks are read when a range needs them.
+    def __init__(self, fileobj):
+        self._file = fileobj
+        fileobj.seek(0)
+        header = fileobj.read(_HEADER.size)
+        if len(header) < _HEADER.size or header[:4] != MAGIC:
+            raise ContainerError('not a DNA container')
+        _, version, compression_id, self.block_bases = _HEADER.unpack(header)
+        if version != VERSION:
+            raise ContainerError('unsupported container version %d' % version)
+        if compression_id not in _BY_ID:
+            raise ContainerError('unknown compression id %d' % compression_id)
+        self.compression, _, self._decompress = _BY_ID[compression_id]
+        self._block_bytes = self.block_bases // 4
+
+        fileobj.seek(-_FOOTER.size, os.SEEK_END)
+        self.length, index_offset, blocks, magic = _FOOTER.unpack(fileobj.read(_FOOTER.size))
+        if magic != FOOTER_MAGIC:
+            raise ContainerError('truncated DNA container, footer not found')
+        fileobj.seek(index_offset)
+        index = fileobj.read(blocks * _INDEX_ENTRY.size)
+        if len(index) != blocks * _INDEX_ENTRY.size:
+            raise ContainerError('truncated DNA container index')
+        self._index = list(_INDEX_ENTRY.iter_unpack(index))
+        # Last block read, sequential reads mostly hit it again
+        self._cached = (None, b'')
+
+    @classmethod
+    def open(cls, path):
+        return cls(open(path, 'rb'))
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.length
+
+    def block(self, number):
+        # Packed bytes of one block
+        if self._cached[0] == number:
+            return self._cached[1]
+        offset, size = self._index[number]
+        self._file.seek(offset)
+        data = self._decompress(self._file.read(size))
+        self._cached = (number, data)
+        return data
+
+    def read_bytes(self, start, stop):
+        # Packed bytes start:stop, i.e. bases 4 * start to 4 * stop
+        stop = min(stop, (self.length + 3) // 4)
+        if start >= stop:
+            return b''
+        first, last = start // self._block_bytes, (stop - 1) // self._block_bytes
+        parts = []
+        for number in range(first, last + 1):
+            base = number * self._block_bytes
+            data = self.block(number)
+            parts.append(data[max(start - base, 0):stop - base])
+        return b''.join(parts)
+
+    def read_packed(self, start=0, stop=None):
+        length = self.length
+        start, stop, _ = slice(start, stop).indices(length)
+        stop = max(start, stop)
+        first = start // 4
+        data = self.read_bytes(first, (stop + 3) // 4)
+        packed = PackedDNA.from_bytes(data, min(len(data) * 4, length - first * 4))
+        return packed[start - first * 4:stop - first * 4]
+
+    def read(self, start=0, stop=None):
+        return str(self.read_packed(start, stop))
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            if index < 0:
+                index += self.length
+            if not 0 <= index < self.length:
+                raise IndexError('container index out of range')
+            return self.read(index, index + 1)
+        if index.step not in (None, 1):
+            raise ValueError('container slices must be contiguous')
+        return self.read(index.start, index.stop)
+
+    def iter_dna(self, start=0, stop=None):
+        # The range as DNA text, one block at a time
+        start, stop, _ = slice(start, stop).indices(self.length)
+        for block_start in range(start - start % self.block_bases, stop, self.block_bases):
+            yield self.read(max(start, block_start), min(stop, block_start + self.block_bases))
+
+
+def pack(dna, compression='zlib', block_bases=BLOCK_BASES):
+    # Whole container as bytes, for sequences that already fit in memory
+    buffer = BytesIO()
+    with ContainerWriter(buffer, compression, block_bases) as writer:
+        writer.write(dna)
+    return buffer.getvalue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m container',
+                                     description='Pack DNA files into block-indexed containers and back.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    pack_parser = commands.add_parser('pack', help='DNA text file to container')
+    pack_parser.add_argument('input')
+    pack_parser.add_argument('output')
+    pack_parser.add_argument('--compression', choices=sorted(COMPRESSIONS), default='zlib')
+    pack_parser.add_argument('--block-bases', type=int, default=BLOCK_BASES,
+                             help='bases per block, a multiple of 4 (default: %(default)s)')
+    unpack_parser = commands.add_parser('unpack', help="container to DNA text, '-' for stdout")
+    unpack_parser.add_argument('input')
+    unpack_parser.add_argument('output')
+    unpack_parser.add_argument('--start', type=int, default=0, help='first base to write')
+    unpack_parser.add_argument('--stop', type=int, default=None, help='base to stop before')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'pack':
+            with open(args.output, 'wb') as dst, ContainerWriter(dst, args.compression, args.block_bases) as writer:
+                for block in strip_sequence_layout(iter_blocks(args.input)):
+                    writer.write(block.decode('ascii'))
+            return 0
+        with ContainerReader.open(args.input) as reader:
+            dst = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+            try:
+                for dna in reader.iter_dna(args.start, args.stop):
+                    dst.write(dna.encode('ascii'))
+            finally:
+                if dst is not sys.stdout.buffer:
+                    dst.close()
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
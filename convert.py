@@ -0,0 +1,149 @@
+import argparse
+import codecs
+import mmap
+import os
+import sys
+import time
+
+from codec import CONVERTERS
+from parallel import iter_convert_parallel
+from stream import incremental_converter
+
+# File converter for inputs too large for the web form, e.g.
+#
+#   python -m convert text_to_dna archive.tar archive.dna
+#   python -m convert dna_to_text archive.dna archive.tar
+#
+# The input is memory-mapped and converted block by block, so a multi-GB
+# file never has to fit in memory. With the default latin-1 encoding every
+# file byte is one character, which makes text modes byte exact for any
+# file, not just text. With --workers N the blocks are converted on a
+# pool of N processes while their output is written in order.
+
+BLOCK_SIZE = 16 << 20
+
+# Modes whose input is a DNA or binary sequence, where line breaks and
+# FASTA-style '>' header lines are not part of the data
+_SEQUENCE_INPUT = ('dna_to_text', 'dna_to_binary', 'binary_to_dna', 'binary_to_text')
+
+
+def iter_blocks(path, size=BLOCK_SIZE):
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, 'madvise'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            for start in range(0, len(mm), size):
+                yield mm[start:start + size]
+
+
+def strip_sequence_layout(blocks):
+    # Drop line breaks and '>' header lines. Blocks without a header take
+    # the single translate() fast path; the line loop only runs on blocks
+    # that actually contain one.
+    in_header = False
+    line_start = True
+    for block in blocks:
+        if not in_header and b'>' not in block:
+            if block:
+                line_start = block.endswith(b'\n')
+            yield block.translate(None, b'\r\n')
+            continue
+        parts = []
+        pos = 0
+        while pos < len(block):
+            if in_header:
+                end = block.find(b'\n', pos)
+                if end == -1:
+                    break
+                in_header = False
+                line_start = True
+                pos = end + 1
+            elif line_start and block[pos] == ord('>'):
+                in_header = True
+            else:
+                end = block.find(b'\n', pos)
+                line_start = end != -1
+                end = len(block) if end == -1 else end + 1
+                parts.append(block[pos:end])
+                pos = end
+        yield b''.join(parts).translate(None, b'\r\n')
+
+
+def convert_file(mode, src, dst, encoding='latin-1', block_size=BLOCK_SIZE, progress=None, workers=None):
+    # Returns (bytes read, bytes written). progress, if given, is called
+    # with the number of input bytes read so far after every block.
+    read = written = 0
+
+    def raw_blocks():
+        nonlocal read
+        for block in iter_blocks(src, block_size):
+            read += len(block)
+            if progress is not None:
+                progress(read)
+            yield block
+
+    blocks = raw_blocks()
+    if mode in _SEQUENCE_INPUT:
+        blocks = strip_sequence_layout(blocks)
+    if workers is not None and workers > 1:
+        for out in iter_convert_parallel(mode, blocks, encoding, workers):
+            dst.write(out)
+            written += len(out)
+        return read, written
+    converter = incremental_converter(mode, errors='strict', encoding=encoding)
+    # One encoder for the whole file, so a BOM is written only once
+    encoder = codecs.getincrementalencoder(encoding)()
+    for block in blocks:
+        out = encoder.encode(converter.feed(block))
+        dst.write(out)
+        written += len(out)
+    out = encoder.encode(converter.flush(), True)
+    dst.write(out)
+    written += len(out)
+    return read, written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m convert',
+        description='Convert files between text, binary and DNA sequences.',
+    )
+    parser.add_argument('mode', choices=sorted(CONVERTERS))
+    parser.add_argument('input', help='file to convert')
+    parser.add_argument('output', help="output file, or '-' for stdout")
+    parser.add_argument('--encoding', default='latin-1',
+                        help='text encoding of text input/output (default: latin-1, byte exact)')
+    parser.add_argument('--block-size', type=int, default=BLOCK_SIZE,
+                        help='bytes converted per block (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='processes converting blocks in parallel, needs a single-byte encoding '
+                             '(default: %(default)s)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='do not report throughput')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        if args.output == '-':
+            read, written = convert_file(args.mode, args.input, sys.stdout.buffer,
+                                         args.encoding, args.block_size, workers=args.workers)
+            sys.stdout.buffer.flush()
+        else:
+            with open(args.output, 'wb', buffering=args.block_size) as dst:
+                read, written = convert_file(args.mode, args.input, dst,
+                                             args.encoding, args.block_size, workers=args.workers)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+
+    if not args.quiet:
+        mb = read / 1e6
+        print(f"{args.mode}: {mb:.1f} MB in -> {written / 1e6:.1f} MB out "
+              f"in {elapsed:.2f}s ({mb / elapsed if elapsed else 0:.1f} MB/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
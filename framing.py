@@ -0,0 +1,270 @@
+import argparse
+import struct
+import sys
+import zlib
+from functools import lru_cache, partial
+
+from codec import _DNA_DIGITS, bytes_to_dna, dna_to_bytes
+
+# Checksummed framing for long DNA payloads, e.g.
+#
+#   python -m framing frame archive.tar archive.fdna
+#   python -m framing verify archive.fdna
+#   python -m framing unframe archive.fdna archive.tar --errors repair
+#
+# The payload is cut into fixed-size blocks. Each block is written as its
+# bases followed by 16 bases of CRC32, taken over the block number and the
+# block's bases as ASCII. Verifying is then one zlib.crc32 per block over
+# the bases as they are, with no decoding, and it names the bad blocks.
+# A block with one substituted (or unreadable, e.g. 'N') base is repaired:
+# CRC32 is linear, so the checksum difference of a single-base error
+# identifies its position and value through a table built once per block
+# length. Blocks with more damage can be skipped. The header and its CRC
+# are repaired the same way, whatever the error policy, since nothing can
+# be read without them. Insertions and deletions shift every later block
+# and are not recoverable.
+#
+#   header   'DNF', version, block size, payload size (16 bytes) + CRC
+#   frames   block bases + CRC bases, the last block may be short
+
+MAGIC = b'DNF'
+VERSION = 1
+BLOCK_SIZE = 256
+# Repair builds a table of 6 entries per base of a block, so blocks are
+# kept small enough for it to stay cheap (64 KiB is about 1.5M entries)
+MAX_BLOCK_SIZE = 64 << 10
+CRC_BASES = 16
+
+_HEADER = struct.Struct('>3sBIQ')
+_HEADER_BASES = _HEADER.size * 4
+_BASES = b'ATGC'
+# ASCII XOR between any two different bases
+_SUBSTITUTIONS = sorted({a ^ b for a in _BASES for b in _BASES if a != b})
+ERROR_POLICIES = ('strict', 'repair', 'skip')
+
+
+class FrameError(ValueError):
+    def __init__(self, message, blocks=()):
+        super().__init__(message)
+        self.blocks = list(blocks)
+
+
+def _crc_bases(value):
+    return bytes_to_dna(value.to_bytes(4, 'big'))
+
+
+def _crc_value(bases):
+    # None if the stored CRC itself is unreadable
+    if len(bases) != CRC_BASES or bases.translate(None, _BASES):
+        return None
+    return int(bases.translate(_DNA_DIGITS), 4)
+
+
+def _block_crc(number, bases):
+    return zlib.crc32(bases, zlib.crc32(number.to_bytes(8, 'big')))
+
+
+def _crc_table():
+    # The reflected CRC32 table zlib uses, byte -> CRC register update
+    table = []
+    for byte in range(256):
+        value = byte
+        for _ in range(8):
+            value = value >> 1 ^ (0xEDB88320 if value & 1 else 0)
+        table.append(value)
+    return table
+
+
+_CRC_TABLE = _crc_table()
+
+
+@lru_cache(maxsize=8)
+def _syndromes(length):
+    # CRC difference -> (position, xor) for every single-base substitution
+    # in a block of length bases. Differences that two errors share are
+    # ambiguous and map to None. The difference an error makes is the CRC
+    # of the error alone (zero start, no final xor): an error in the last
+    # base gives the table entry of its xor, and each base further from
+    # the end feeds one more zero byte through the register, so the whole
+    # table takes one step per position instead of one CRC per position.
+    table = {}
+    for xor in _SUBSTITUTIONS:
+        syndrome = _CRC_TABLE[xor]
+        for position in range(length - 1, -1, -1):
+            table[syndrome] = None if syndrome in table else (position, xor)
+            syndrome = syndrome >> 8 ^ _CRC_TABLE[syndrome & 0xFF]
+    return table
+
+
+def frame(data, block_size=BLOCK_SIZE):
+    # bytes -> framed DNA string
+    if not 0 < block_size <= MAX_BLOCK_SIZE:
+        raise ValueError('block size must be between 1 and %d bytes' % MAX_BLOCK_SIZE)
+    header = _HEADER.pack(MAGIC, VERSION, block_size, len(data))
+    header_bases = bytes_to_dna(header)
+    parts = [header_bases, _crc_bases(zlib.crc32(header_bases.encode('ascii')))]
+    for number, start in enumerate(range(0, len(data), block_size)):
+        bases = bytes_to_dna(data[start:start + block_size])
+        parts.append(bases)
+        parts.append(_crc_bases(_block_crc(number, bases.encode('ascii'))))
+    return ''.join(parts)
+
+
+def _fix(block, syndrome):
+    # block (a bytearray of bases) with the single-base error that explains
+    # the CRC difference fixed, or None
+    if syndrome and not syndrome & ~(3 << (syndrome.bit_length() - 1 & ~1)):
+        # Only one base of the stored CRC differs, the bases are fine
+        return block
+    found = _syndromes(len(block)).get(syndrome)
+    if found is None or block[found[0]] ^ found[1] not in _BASES:
+        return None
+    block[found[0]] ^= found[1]
+    return block
+
+
+def _repair(block, crc, checksum):
+    # block (a bytearray of bases) repaired against its CRC bases, or None.
+    # checksum(bases) is the CRC the bases should have: zlib.crc32 for the
+    # header, _block_crc with the block number for blocks.
+    stored = _crc_value(crc)
+    if stored is None:
+        # One unreadable base in the CRC itself: fine if a base there
+        # makes it match the block as it is
+        if len(crc) != CRC_BASES or len(crc.translate(None, _BASES)) != 1:
+            return None
+        expected = _crc_bases(checksum(block)).encode('ascii')
+        same = sum(a == b for a, b in zip(crc, expected))
+        return block if same == CRC_BASES - 1 else None
+    unreadable = len(block.translate(None, _BASES))
+    if unreadable > 1:
+        return None
+    if unreadable:
+        # The position is known, try each base there
+        position = next(i for i, byte in enumerate(block) if byte not in _BASES)
+        for base in _BASES:
+            block[position] = base
+            if checksum(block) == stored:
+                return block
+        return None
+    return _fix(block, checksum(block) ^ stored)
+
+
+class FramedReader:
+    # Parses the header and checks, repairs or decodes blocks on request.
+    def __init__(self, framed):
+        # str or ASCII bytes; line breaks and spaces are not part of the data
+        if isinstance(framed, str):
+            framed = framed.encode('ascii', 'replace')
+        framed = bytes(framed).translate(None, b' \r\n\t').upper()
+        self._bases = framed
+        header_end = _HEADER_BASES + CRC_BASES
+        if len(framed) < header_end:
+            raise FrameError('not a framed DNA payload, header missing')
+        header = bytearray(framed[:_HEADER_BASES])
+        crc = framed[_HEADER_BASES:header_end]
+        if zlib.crc32(header) != _crc_value(crc):
+            header = _repair(header, crc, zlib.crc32)
+            if header is None:
+                raise FrameError('framed DNA header is damaged')
+        magic, version, self.block_size, self.size = _HEADER.unpack(dna_to_bytes(header.decode('ascii')))
+        if magic != MAGIC or version != VERSION or not 0 < self.block_size <= MAX_BLOCK_SIZE:
+            raise FrameError('not a framed DNA payload')
+        self.blocks = -(-self.size // self.block_size)
+        self._start = header_end
+        self._stride = self.block_size * 4 + CRC_BASES
+        expected = header_end + self.size * 4 + self.blocks * CRC_BASES
+        if len(framed) != expected:
+            raise FrameError('framed payload has %d bases, expected %d; bases were inserted or lost'
+                             % (len(framed), expected))
+
+    def _block(self, number):
+        # (bases, CRC bases) of one block
+        start = self._start + number * self._stride
+        size = min(self.block_size, self.size - number * self.block_size) * 4
+        return self._bases[start:start + size], self._bases[start + size:start + size + CRC_BASES]
+
+    def verify(self):
+        # Numbers of the blocks whose CRC does not match
+        bad = []
+        for number in range(self.blocks):
+            bases, crc = self._block(number)
+            if _block_crc(number, bases) != _crc_value(crc):
+                bad.append(number)
+        return bad
+
+    def decode(self, errors='strict'):
+        # strict: fail on any bad block. repair: fix single-base errors and
+        # fail on the rest. skip: fix what can be fixed and leave out the
+        # blocks that can't (reported in self.skipped).
+        if errors not in ERROR_POLICIES:
+            raise ValueError('unknown error policy %r, expected one of %s' % (errors, ', '.join(ERROR_POLICIES)))
+        parts = []
+        self.repaired, self.skipped = [], []
+        for number in range(self.blocks):
+            bases, crc = self._block(number)
+            if _block_crc(number, bases) == _crc_value(crc):
+                parts.append(bases)
+                continue
+            fixed = None if errors == 'strict' else _repair(bytearray(bases), crc, partial(_block_crc, number))
+            if fixed is not None:
+                self.repaired.append(number)
+                parts.append(bytes(fixed))
+            elif errors == 'skip':
+                self.skipped.append(number)
+            else:
+                raise FrameError('block %d is damaged' % number, [number])
+        return dna_to_bytes(b''.join(parts).decode('ascii'))
+
+
+def verify(framed):
+    return FramedReader(framed).verify()
+
+
+def unframe(framed, errors='strict'):
+    return FramedReader(framed).decode(errors)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m framing',
+                                     description='Frame data as checksummed DNA, verify and decode it.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    frame_parser = commands.add_parser('frame', help='any file to framed DNA')
+    frame_parser.add_argument('input')
+    frame_parser.add_argument('output')
+    frame_parser.add_argument('--block-size', type=int, default=BLOCK_SIZE,
+                              help='payload bytes per block, at most %d (default: %%(default)s)' % MAX_BLOCK_SIZE)
+    verify_parser = commands.add_parser('verify', help='list damaged blocks')
+    verify_parser.add_argument('input')
+    unframe_parser = commands.add_parser('unframe', help='framed DNA back to the original file')
+    unframe_parser.add_argument('input')
+    unframe_parser.add_argument('output')
+    unframe_parser.add_argument('--errors', choices=ERROR_POLICIES, default='strict')
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.input, 'rb') as f:
+            data = f.read()
+        if args.command == 'frame':
+            with open(args.output, 'w') as f:
+                f.write(frame(data, args.block_size))
+            return 0
+        reader = FramedReader(data)
+        if args.command == 'verify':
+            bad = reader.verify()
+            print('%d blocks, %d damaged%s' % (reader.blocks, len(bad), ': ' + ', '.join(map(str, bad)) if bad else ''))
+            return 1 if bad else 0
+        payload = reader.decode(args.errors)
+        with open(args.output, 'wb') as f:
+            f.write(payload)
+        for label, blocks in (('repaired', reader.repaired), ('skipped', reader.skipped)):
+            if blocks:
+                print('%s blocks: %s' % (label, ', '.join(map(str, blocks))), file=sys.stderr)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
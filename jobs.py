@@ -0,0 +1,196 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Blueprint, abort, jsonify, request, send_file, url_for
+
+from api import OCTET_STREAM, body_encoding
+from codec import CONVERTERS
+from convert import convert_file
+from stream import read_chunks
+
+# Background jobs for conversions too large for one HTTP round trip:
+#
+#   POST   /api/v1/jobs/<mode>       upload the input, returns 202 and a job id
+#   GET    /api/v1/jobs/<id>         status and progress
+#   GET    /api/v1/jobs/<id>/result  download the output once done
+#   DELETE /api/v1/jobs/<id>         drop the job and its files
+#
+# Uploads and results live on local disk under JOBS_DIR and are converted
+# by a local thread pool with the same mmap file converter as the CLI, so
+# no broker is needed and memory use doesn't depend on the file size.
+# Finished jobs are removed after JOB_TTL seconds.
+
+JOBS_DIR = os.environ.get('JOBS_DIR') or os.path.join(tempfile.gettempdir(), 'dnaconv-jobs')
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_TTL = int(os.environ.get('JOB_TTL', 3600))
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+class Job:
+    def __init__(self, mode, encoding, directory):
+        self.id = uuid.uuid4().hex
+        self.mode = mode
+        self.encoding = encoding
+        self.directory = os.path.join(directory, self.id)
+        self.input_path = os.path.join(self.directory, 'input')
+        self.output_path = os.path.join(self.directory, 'output')
+        self.status = 'queued'
+        self.error = None
+        self.input_bytes = 0
+        self.bytes_done = 0
+        self.output_bytes = 0
+        self.created = time.time()
+        self.finished = None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'mode': self.mode,
+            'status': self.status,
+            'progress': round(self.bytes_done / self.input_bytes, 4) if self.input_bytes else
+                        float(self.status == 'done'),
+            'input_bytes': self.input_bytes,
+            'output_bytes': self.output_bytes,
+            'error': self.error,
+        }
+
+
+class JobManager:
+    def __init__(self, directory=JOBS_DIR, workers=JOB_WORKERS, ttl=JOB_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, mode, encoding, write_input):
+        # write_input(path) stores the upload; the job is queued once it's on disk
+        self.cleanup()
+        job = Job(mode, encoding, self.directory)
+        os.makedirs(job.directory)
+        try:
+            write_input(job.input_path)
+        except BaseException:
+            shutil.rmtree(job.directory, ignore_errors=True)
+            raise
+        job.input_bytes = os.path.getsize(job.input_path)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job)
+        return job
+
+    def _run(self, job):
+        job.status = 'running'
+
+        def progress(done):
+            job.bytes_done = done
+
+        try:
+            with open(job.output_path, 'wb', buffering=UPLOAD_CHUNK_SIZE) as dst:
+                convert_file(job.mode, job.input_path, dst, job.encoding, progress=progress)
+        except Exception as e:
+            # Anything left 'running' could never be deleted or expire
+            job.error = str(e) or type(e).__name__
+            job.status = 'failed'
+        else:
+            job.output_bytes = os.path.getsize(job.output_path)
+            job.status = 'done'
+        finally:
+            job.finished = time.time()
+            # The upload is no longer needed either way
+            try:
+                os.remove(job.input_path)
+            except OSError:
+                pass
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def delete(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in ('queued', 'running'):
+                return False
+            del self._jobs[job_id]
+        shutil.rmtree(job.directory, ignore_errors=True)
+        return True
+
+    def cleanup(self):
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished is not None and job.finished < cutoff]
+        for job_id in expired:
+            self.delete(job_id)
+
+
+job_manager = JobManager()
+
+jobs = Blueprint('jobs', __name__, url_prefix='/api/v1/jobs')
+
+
+def job_or_404(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        abort(404)
+    return job
+
+
+@jobs.route('/<mode>', methods=['POST'])
+def submit(mode):
+    if mode not in CONVERTERS:
+        abort(404)
+    upload = request.files.get('file')
+    if upload is not None:
+        encoding = body_encoding(upload.mimetype, upload.mimetype_params)
+        write_input = upload.save
+    else:
+        encoding = body_encoding(request.mimetype, request.mimetype_params)
+
+        def write_input(path):
+            with open(path, 'wb') as f:
+                for chunk in read_chunks(request.stream, UPLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+    try:
+        ''.encode(encoding)
+    except LookupError:
+        return jsonify(error='unknown charset %r' % encoding), 400
+    job = job_manager.submit(mode, encoding, write_input)
+    response = jsonify(job.to_dict())
+    response.status_code = 202
+    response.headers['Location'] = url_for('jobs.status', job_id=job.id)
+    return response
+
+
+@jobs.route('/<job_id>', methods=['GET'])
+def status(job_id):
+    return jsonify(job_or_404(job_id).to_dict())
+
+
+@jobs.route('/<job_id>/result', methods=['GET'])
+def result(job_id):
+    job = job_or_404(job_id)
+    if job.status != 'done':
+        return jsonify(job.to_dict()), 409
+    mimetype = OCTET_STREAM if job.encoding == 'latin-1' else 'text/plain; charset=%s' % job.encoding
+    response = send_file(job.output_path, mimetype=mimetype, as_attachment=True,
+                         download_name='%s.%s' % (job.id, job.mode), max_age=0)
+    # A user's result, not to be kept by shared caches past DELETE or JOB_TTL
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.no_store = True
+    return response
+
+
+@jobs.route('/<job_id>', methods=['DELETE'])
+def delete(job_id):
+    job = job_or_404(job_id)
+    if not job_manager.delete(job.id):
+        return jsonify(job.to_dict()), 409
+    return '', 204
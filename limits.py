@@ -0,0 +1,186 @@
+import io
+import math
+import os
+import threading
+import time
+
+from flask import Blueprint, Response, g, request
+
+# Input size limits and per-client throttling for the conversion
+# endpoints. Both are checked in a before_request hook from the
+# Content-Length header and the client address alone, so an oversized or
+# abusive request is refused before its body is read or parsed. Bodies
+# sent without a length (chunked) are read up to the limit before the view
+# runs, so they get the same 413 instead of a response cut off midway.
+#
+# Per-mode limits default to what keeps the output under MAX_OUTPUT_BYTES
+# (text_to_binary output is 8x its input, dna_to_text 1/4) and can be set
+# one by one, e.g. MAX_TEXT_TO_DNA_BYTES=1000000. The client limiter
+# allows RATE_LIMIT requests per second with bursts of RATE_BURST, and at
+# most CLIENT_CONCURRENCY requests in flight per client address; 0 turns
+# each off.
+
+MAX_OUTPUT_BYTES = int(os.environ.get('MAX_OUTPUT_BYTES', 16 << 20))
+# Output size per input symbol
+_EXPANSION = {
+    'text_to_dna': 4,
+    'text_to_binary': 8,
+    'dna_to_binary': 2,
+    'binary_to_dna': 0.5,
+    'dna_to_text': 0.25,
+    'binary_to_text': 0.125,
+}
+MODE_LIMITS = {
+    mode: int(os.environ.get('MAX_%s_BYTES' % mode.upper(), MAX_OUTPUT_BYTES // max(1, expansion)))
+    for mode, expansion in _EXPANSION.items()
+}
+# Form and JSON bodies escape their data, by up to 3x for percent-encoding
+BODY_OVERHEAD = 3
+FORM_LIMIT = max(MODE_LIMITS.values()) * BODY_OVERHEAD
+BATCH_LIMIT = int(os.environ.get('MAX_BATCH_BYTES', 64 << 20))
+# Background job uploads are spooled to disk, unlimited unless set
+JOB_LIMIT = int(os.environ.get('MAX_JOB_BYTES', 0)) or None
+
+RATE_LIMIT = float(os.environ.get('RATE_LIMIT', 20))
+RATE_BURST = float(os.environ.get('RATE_BURST', 40))
+CLIENT_CONCURRENCY = int(os.environ.get('CLIENT_CONCURRENCY', 4))
+
+
+def check_input(mode, data):
+    # For bodies parsed as a whole (form fields, JSON items), after parsing
+    limit = MODE_LIMITS.get(mode)
+    if limit is not None and len(data) > limit:
+        raise ValueError('input too large for %s: %d characters, the limit is %d' % (mode, len(data), limit))
+
+
+class ClientLimiter:
+    # A token bucket per client for the request rate, plus a count of its
+    # requests in flight. Idle clients are forgotten after idle seconds.
+    def __init__(self, rate=RATE_LIMIT, burst=RATE_BURST, max_concurrent=CLIENT_CONCURRENCY,
+                 idle=300, max_clients=10000):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_concurrent = max_concurrent
+        self.idle = idle
+        self.max_clients = max_clients
+        self.enabled = bool(rate or max_concurrent)
+        self.rejected = 0
+        # client -> [tokens, last update, requests in flight]
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, client):
+        # None if the request may go ahead (release() it when done),
+        # otherwise the seconds to wait before retrying
+        now = time.monotonic()
+        with self._lock:
+            state = self._clients.get(client)
+            if state is None:
+                if len(self._clients) >= self.max_clients:
+                    self._prune(now)
+                state = self._clients[client] = [self.burst, now, 0]
+            tokens = min(self.burst, state[0] + (now - state[1]) * self.rate)
+            state[0], state[1] = tokens, now
+            if self.max_concurrent and state[2] >= self.max_concurrent:
+                self.rejected += 1
+                return 1.0
+            if self.rate:
+                if tokens < 1:
+                    self.rejected += 1
+                    return (1 - tokens) / self.rate
+                state[0] = tokens - 1
+            state[2] += 1
+            return None
+
+    def release(self, client):
+        with self._lock:
+            state = self._clients.get(client)
+            if state is not None:
+                state[2] -= 1
+
+    def _prune(self, now):
+        cutoff = now - self.idle
+        for client in [client for client, state in self._clients.items() if not state[2] and state[1] < cutoff]:
+            del self._clients[client]
+
+    def reset(self):
+        with self._lock:
+            self._clients.clear()
+            self.rejected = 0
+
+
+client_limiter = ClientLimiter()
+
+limits = Blueprint('limits', __name__)
+
+
+def body_limit(endpoint, view_args):
+    # Largest body accepted by an endpoint, None for no limit
+    if endpoint == 'index':
+        return FORM_LIMIT
+    if endpoint == 'api.convert':
+        return MODE_LIMITS.get(view_args.get('mode'))
+    if endpoint == 'api.live':
+        limit = MODE_LIMITS.get(view_args.get('mode'))
+        return None if limit is None else limit * BODY_OVERHEAD
+    if endpoint == 'api.batch':
+        return BATCH_LIMIT
+    if endpoint == 'jobs.submit':
+        return JOB_LIMIT
+    return None
+
+
+def read_up_to(stream, size):
+    parts = []
+    while size > 0:
+        chunk = stream.read(min(size, 64 << 10))
+        if not chunk:
+            break
+        parts.append(chunk)
+        size -= len(chunk)
+    return b''.join(parts)
+
+
+def refuse(status, message, headers=None):
+    # Sent without reading the body; closing the connection means the
+    # server doesn't have to drain it either
+    response = Response('Error: %s\n' % message, status=status, mimetype='text/plain')
+    response.headers['Connection'] = 'close'
+    response.headers.update(headers or {})
+    return response
+
+
+@limits.before_app_request
+def check_request():
+    if request.method != 'POST':
+        return None
+    limit = body_limit(request.endpoint, request.view_args or {})
+    if limit is not None and request.content_length is not None and request.content_length > limit:
+        return refuse(413, 'request body too large, the limit is %d bytes' % limit)
+    if client_limiter.enabled:
+        client = request.remote_addr or ''
+        retry = client_limiter.acquire(client)
+        if retry is not None:
+            return refuse(429, 'too many requests, retry later', {'Retry-After': str(math.ceil(retry))})
+        g.limited_client = client
+    if limit is not None:
+        environ = request.environ
+        if request.content_length is None and environ.get('wsgi.input_terminated'):
+            body = read_up_to(environ['wsgi.input'], limit + 1)
+            if len(body) > limit:
+                return refuse(413, 'request body too large, the limit is %d bytes' % limit)
+            # The view reads the buffered body as if it had been sent with a length
+            environ['wsgi.input'] = io.BytesIO(body)
+            environ['CONTENT_LENGTH'] = str(len(body))
+            environ.pop('HTTP_TRANSFER_ENCODING', None)
+            del environ['wsgi.input_terminated']
+        request.max_content_length = limit
+        request.max_form_memory_size = limit
+    return None
+
+
+@limits.teardown_app_request
+def release_request(exc):
+    client = g.pop('limited_client', None)
+    if client is not None:
+        client_limiter.release(client)
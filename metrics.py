@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Blueprint, Response, abort
+
+from cache import result_cache
+
+# Per-mode counters and histograms for the conversion hot path, exposed on
+# /metrics in the Prometheus text format. Set METRICS_ENABLED=0 to turn
+# recording off; every call site checks metrics.enabled first, so a
+# disabled registry costs one attribute lookup per request.
+
+_SECONDS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 60)
+_BYTES = tuple(1 << shift for shift in range(6, 32, 2))
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    'dnaconv_conversion_seconds': ('histogram', 'Time spent converting, per mode.', _SECONDS),
+    'dnaconv_input_bytes': ('histogram', 'Size of conversion inputs, per mode.', _BYTES),
+    'dnaconv_output_bytes': ('histogram', 'Size of conversion outputs, per mode.', _BYTES),
+    'dnaconv_render_seconds': ('histogram', 'Time spent rendering the HTML page.', _SECONDS),
+    'dnaconv_errors_total': ('counter', 'Conversions that failed, per mode.', None),
+}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        # Prometheus buckets are inclusive upper bounds
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _series(name, labels):
+    if not labels:
+        return name
+    return '%s{%s}' % (name, ','.join('%s="%s"' % (key, value.replace('\\', '\\\\').replace('"', '\\"'))
+                                        for key, value in labels))
+
+
+class Metrics:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # (name, labels) -> Histogram or counter value
+        self._series = {}
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._series.get(key)
+            if histogram is None:
+                histogram = self._series[key] = Histogram(METRICS[name][2])
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def record_conversion(self, mode, input_size, output_size, seconds):
+        self.observe('dnaconv_conversion_seconds', seconds, mode=mode)
+        self.observe('dnaconv_input_bytes', input_size, mode=mode)
+        self.observe('dnaconv_output_bytes', output_size, mode=mode)
+
+    def record_error(self, mode):
+        self.inc('dnaconv_errors_total', mode=mode)
+
+    def record_render(self, seconds):
+        self.observe('dnaconv_render_seconds', seconds)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        with self._lock:
+            series = sorted(self._series.items(), key=lambda item: item[0])
+            snapshot = [(key, (list(value.counts), value.sum, value.count) if isinstance(value, Histogram) else value)
+                        for key, value in series]
+        lines = []
+        for name, (kind, help_text, buckets) in METRICS.items():
+            lines.append('# HELP %s %s' % (name, help_text))
+            lines.append('# TYPE %s %s' % (name, kind))
+            for (series_name, labels), value in snapshot:
+                if series_name != name:
+                    continue
+                if kind == 'counter':
+                    lines.append('%s %s' % (_series(name, labels), value))
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(buckets + ('+Inf',), counts):
+                    cumulative += bucket_count
+                    lines.append('%s %d' % (_series(name + '_bucket', labels + (('le', str(bound)),)), cumulative))
+                lines.append('%s %s' % (_series(name + '_sum', labels), total))
+                lines.append('%s %d' % (_series(name + '_count', labels), count))
+        lines.extend(self._cache_lines())
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _cache_lines():
+        stats = result_cache.stats()
+        lines = []
+        for key in ('hits', 'misses', 'evictions', 'bypassed'):
+            name = 'dnaconv_cache_%s_total' % key
+            lines += ['# TYPE %s counter' % name, '%s %d' % (name, stats[key])]
+        for key in ('entries', 'bytes'):
+            name = 'dnaconv_cache_%s' % key
+            lines += ['# TYPE %s gauge' % name, '%s %d' % (name, stats[key])]
+        return lines
+
+
+metrics = Metrics(enabled=os.environ.get('METRICS_ENABLED', '1') != '0')
+
+metrics_blueprint = Blueprint('metrics', __name__)
+
+
+@metrics_blueprint.route('/metrics')
+def metrics_endpoint():
+    if not metrics.enabled:
+        abort(404)
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class CountingIterator:
+    # Passes chunks through and keeps the total size seen so far
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self.size = 0
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            self.size += len(chunk)
+            yield chunk
+
+
+def timed(results, mode, input_size):
+    # Wrap a streamed conversion so it is recorded once it has finished.
+    # input_size is called at the end, when the whole body has been read.
+    # The time includes waiting on the client, as the body is read lazily.
+    started = time.perf_counter()
+    output_size = 0
+    try:
+        for result in results:
+            output_size += len(result)
+            yield result
+    except ValueError:
+        metrics.record_error(mode)
+        raise
+    metrics.record_conversion(mode, input_size(), output_size, time.perf_counter() - started)
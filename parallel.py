@@ -0,0 +1,138 @@
+import codecs
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import codec
+from codec import CONVERTERS
+from stream import _UNIT
+
+# Parallel versions of the converters for large inputs. Every mode maps a
+# fixed number of input symbols to a fixed piece of output (4 bases per
+# byte, 2 bits per base, ...), so the input can be cut on those unit
+# boundaries, converted shard by shard and joined back in order.
+#
+# Only part of each conversion runs in the NumPy kernels: upper(),
+# replace(), the validity checks and str encode/decode hold the GIL, so
+# processes are the default. The parent only cuts the input; everything
+# else happens in the workers.
+
+# Inputs shorter than this stay on the single-threaded path
+PARALLEL_THRESHOLD = 8 << 20
+# Shards per worker; a little more than one evens out stragglers
+SHARDS_PER_WORKER = 4
+# Encodings where every byte is one character, so byte blocks can be cut
+# anywhere and decoded on their own
+SINGLE_BYTE_ENCODINGS = ('iso8859-1', 'ascii')
+# Modes whose converters drop spaces, which shifts the unit boundaries
+_SPACES_DROPPED = ('dna_to_text', 'dna_to_binary', 'binary_to_dna')
+
+_executors = {}
+
+
+def _prepare(mode, data):
+    # Returns (data, unit) with the spaces the converter would drop
+    # removed up front so shards line up, or None when the input can't be
+    # cut independently. Upper-casing is left to the workers.
+    if mode == 'text_to_dna':
+        # Above Latin-1 characters take a variable number of bits, so the
+        # base alignment of a shard depends on everything before it
+        if not data.isascii():
+            try:
+                data.encode('latin-1')
+            except UnicodeEncodeError:
+                return None
+        return data, 1
+    if mode == 'text_to_binary':
+        return data, 1
+    if mode in _SPACES_DROPPED:
+        return data.replace(' ', '') if ' ' in data else data, _UNIT[mode]
+    if mode == 'binary_to_text':
+        return data, 8
+    raise ValueError('unknown conversion mode %r' % mode)
+
+
+def _convert_shard(mode, backend, shard):
+    if codec.get_backend() != backend:
+        codec.set_backend(backend)
+    return CONVERTERS[mode](shard)
+
+
+def _convert_block(mode, backend, encoding, block):
+    if codec.get_backend() != backend:
+        codec.set_backend(backend)
+    return CONVERTERS[mode](block.decode(encoding)).encode(encoding)
+
+
+def get_executor(kind=None, workers=None):
+    # Processes by default; threads only pay off where the NumPy kernels
+    # dominate, so they have to be asked for
+    if kind is None:
+        kind = 'process'
+    workers = workers or os.cpu_count() or 1
+    key = (kind, workers)
+    if key not in _executors:
+        if kind == 'process':
+            _executors[key] = ProcessPoolExecutor(max_workers=workers)
+        elif kind == 'thread':
+            _executors[key] = ThreadPoolExecutor(max_workers=workers)
+        else:
+            raise ValueError("executor kind must be 'process' or 'thread'")
+    return _executors[key], workers
+
+
+def shutdown():
+    while _executors:
+        _, executor = _executors.popitem()
+        executor.shutdown()
+
+
+def convert_parallel(mode, data, workers=None, threshold=PARALLEL_THRESHOLD, kind=None):
+    convert = CONVERTERS.get(mode)
+    if convert is None:
+        raise ValueError('unknown conversion mode %r' % mode)
+    if len(data) < threshold or (workers is not None and workers < 2):
+        return convert(data)
+    prepared = _prepare(mode, data)
+    if prepared is None:
+        return convert(data)
+    data, unit = prepared
+    # Anything short of a whole unit at the end is dropped by the converter
+    data = data[:len(data) - len(data) % unit]
+
+    executor, workers = get_executor(kind, workers)
+    size = -(-len(data) // (workers * SHARDS_PER_WORKER))
+    size = max(unit, size + (-size % unit))
+    shards = [data[i:i + size] for i in range(0, len(data), size)]
+    backend = codec.get_backend()
+    results = executor.map(_convert_shard, [mode] * len(shards), [backend] * len(shards), shards)
+    return ''.join(results)
+
+
+def iter_convert_parallel(mode, blocks, encoding='latin-1', workers=None, kind=None):
+    # Converts an iterable of byte blocks on a pool and yields the encoded
+    # output in order. Blocks are cut on unit boundaries in the parent with
+    # bytes operations only; decoding, converting and encoding run in the
+    # workers, with at most 2 blocks per worker in flight.
+    if mode not in CONVERTERS:
+        raise ValueError('unknown conversion mode %r' % mode)
+    if codecs.lookup(encoding).name not in SINGLE_BYTE_ENCODINGS:
+        raise ValueError('parallel conversion needs a single-byte encoding such as latin-1, got %r' % encoding)
+    unit = _UNIT[mode]
+    executor, workers = get_executor(kind, workers)
+    backend = codec.get_backend()
+    pending = deque()
+    carry = b''
+    for block in blocks:
+        if mode in _SPACES_DROPPED:
+            block = block.translate(None, b' ')
+        block = carry + block
+        cut = len(block) - len(block) % unit
+        carry = block[cut:]
+        if cut:
+            pending.append(executor.submit(_convert_block, mode, backend, encoding, block[:cut]))
+        while len(pending) >= 2 * workers:
+            yield pending.popleft().result()
+    # A carry shorter than a unit is dropped, like the serial converters do
+    while pending:
+        yield pending.popleft().result()
@@ -0,0 +1,282 @@
+import sys
+from itertools import permutations
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, QuadScheme then maps in pure Python
+    np = None
+
+from codec import (
+    CONVERTERS, PackedDNA, _is_bases, binary_to_bytes, binary_to_dna_seq, binary_to_text, bytes_to_binary,
+    bytes_to_dna, dna_to_binary_seq, dna_to_bytes, normalize_dna, text_to_binary,
+)
+
+# Alternative ways of writing bytes as bases, selectable by name:
+#
+#   standard   00=A 01=T 10=G 11=C, the codec's own tables
+#   acgt       00=A 01=C 10=G 11=T, alphabetical order
+#   twobit     00=T 01=C 10=A 11=G, the UCSC .2bit order
+#   scrambled  the standard code after XOR with a fixed LFSR keystream, so
+#              structured input (zero padding, repeated bytes, digits) comes
+#              out like random bases: GC near 50% and runs of one base
+#              rarely past 10, where standard writes '9999' as 16 A's. Only
+#              input that happens to match the keystream is not helped.
+#   goldman    base 3 after Goldman et al. (2013): each byte is 6 trits and
+#              each trit picks one of the 3 bases that differ from the
+#              previous one, so the output never repeats a base
+#
+# Any permutation of ATGC (e.g. 'CAGT') also works as a name and is
+# registered on first use. Every scheme is compiled to lookup tables when it
+# is registered; conversions only index into them, per byte or per C-level
+# translate, never per symbol through a dict.
+
+BASES = 'ATGC'
+
+
+def _normalize(dna):
+    # Packed sequences hold clean bases already, as this scheme's letters
+    if isinstance(dna, PackedDNA):
+        return str(dna)
+    return normalize_dna(dna)
+
+
+class Scheme:
+    # A scheme turns bytes into bases and back. Subclasses provide encode()
+    # and decode(); text and binary converters are built on top of them.
+    bases_per_byte = 4
+
+    def __init__(self, name):
+        self.name = name
+        # Same modes and signatures as codec.CONVERTERS
+        self.converters = {
+            'text_to_dna': self.text_to_dna,
+            'dna_to_text': self.dna_to_text,
+            'binary_to_dna': self.binary_to_dna,
+            'dna_to_binary': self.dna_to_binary,
+            'text_to_binary': text_to_binary,
+            'binary_to_text': binary_to_text,
+        }
+
+    def encode(self, data):
+        raise NotImplementedError
+
+    def decode(self, dna):
+        raise NotImplementedError
+
+    def _bases(self, dna):
+        # Normalized DNA cut to whole bytes; a trailing partial byte is dropped
+        dna = _normalize(dna)
+        if not _is_bases(dna):
+            raise ValueError('invalid DNA sequence, expected only A, T, G and C')
+        return dna[:len(dna) - len(dna) % self.bases_per_byte]
+
+    def text_to_dna(self, text, encoding=None):
+        if encoding is None:
+            try:
+                data = text.encode('latin-1')
+            except UnicodeEncodeError:
+                raise ValueError('the %s scheme needs a text encoding (e.g. utf-8) '
+                                 'for characters above U+00FF' % self.name) from None
+        else:
+            data = text.encode(encoding)
+        return self.encode(data)
+
+    def dna_to_text(self, dna, encoding=None, errors='strict'):
+        return self.decode(dna).decode(encoding or 'latin-1', errors)
+
+    def binary_to_dna(self, binary):
+        binary = binary.replace(' ', '')
+        if len(binary) % 8:
+            raise ValueError('the %s scheme encodes whole bytes, got %d bits' % (self.name, len(binary)))
+        return self.encode(binary_to_bytes(binary))
+
+    def dna_to_binary(self, dna):
+        return bytes_to_binary(self.decode(dna))
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, self.name)
+
+
+class StandardScheme(Scheme):
+    # The codec itself, unchanged
+    def __init__(self, name='standard'):
+        super().__init__(name)
+        self.converters = CONVERTERS
+
+    def encode(self, data):
+        return bytes_to_dna(data)
+
+    def decode(self, dna):
+        return dna_to_bytes(dna)
+
+
+class PermutationScheme(Scheme):
+    # A different base for each bit pair. The standard kernels run as usual
+    # and one str.translate maps their bases to this order and back, so
+    # 2-bit granularity and the standard error markers are kept.
+    def __init__(self, name, order):
+        if sorted(order) != sorted(BASES):
+            raise ValueError('expected a permutation of %s, got %r' % (BASES, order))
+        super().__init__(name)
+        self.order = order
+        self._from_standard = str.maketrans(BASES, order)
+        self._to_standard = str.maketrans(order, BASES)
+
+    def encode(self, data):
+        return bytes_to_dna(data).translate(self._from_standard)
+
+    def decode(self, dna):
+        return dna_to_bytes(_normalize(dna).translate(self._to_standard))
+
+    def binary_to_dna(self, binary):
+        return binary_to_dna_seq(binary).translate(self._from_standard)
+
+    def dna_to_binary(self, dna):
+        return dna_to_binary_seq(_normalize(dna).translate(self._to_standard))
+
+
+class QuadScheme(Scheme):
+    # Any one-to-one table of byte -> 4 bases. Every 4 bases are read as
+    # one native uint32, so both directions are a single table lookup per
+    # byte: np.take and a binary search with NumPy, otherwise a list join
+    # like the codec's Python backend and a dict.
+    def __init__(self, name, quads):
+        super().__init__(name)
+        if len(set(quads)) != 256 or not all(len(quad) == 4 and _is_bases(quad) for quad in quads):
+            raise ValueError('expected 256 distinct 4-base quads')
+        self._encode = [quad.encode('ascii') for quad in quads]
+        self._decode = {int.from_bytes(quad, sys.byteorder): byte for byte, quad in enumerate(self._encode)}
+        if np is not None:
+            self._quads = np.frombuffer(b''.join(self._encode), dtype=np.uint32)
+            self._order = np.argsort(self._quads).astype(np.uint8)
+            self._sorted = self._quads[self._order]
+
+    def encode(self, data):
+        if np is not None:
+            return np.take(self._quads, np.frombuffer(data, dtype=np.uint8)).tobytes().decode('ascii')
+        return b''.join(map(self._encode.__getitem__, data)).decode('ascii')
+
+    def decode(self, dna):
+        dna = self._bases(dna).encode('ascii')
+        if np is None:
+            return bytes(map(self._decode.__getitem__, memoryview(dna).cast('I')))
+        quads = np.frombuffer(dna, dtype=np.uint32)
+        found = np.searchsorted(self._sorted, quads).clip(max=255)
+        if not np.array_equal(self._sorted[found], quads):
+            raise ValueError('invalid DNA for the %s scheme' % self.name)
+        return self._order[found].tobytes()
+
+
+def lfsr_keystream(size, state=0xACE1, taps=0xB400):
+    # size bytes from a 16-bit Galois LFSR with a maximal-length tap mask
+    out = bytearray()
+    for _ in range(size):
+        byte = 0
+        for _ in range(8):
+            bit = state & 1
+            state >>= 1
+            if bit:
+                state ^= taps
+            byte = byte << 1 | bit
+        out.append(byte)
+    return bytes(out)
+
+
+class ScrambledScheme(Scheme):
+    # XOR with a repeating keystream, then the codec's own tables. XOR is
+    # its own inverse, so decoding is the same XOR after dna_to_bytes. It
+    # runs as one np.bitwise_xor, or one big-int XOR without NumPy.
+    def __init__(self, name='scrambled', keystream=None):
+        super().__init__(name)
+        self._key = keystream or lfsr_keystream(4096)
+        if np is not None:
+            self._key_array = np.frombuffer(self._key, dtype=np.uint8)
+
+    def _xor(self, data):
+        if not data:
+            return b''
+        if np is not None:
+            data = np.frombuffer(data, dtype=np.uint8)
+            return np.bitwise_xor(data, np.resize(self._key_array, len(data))).tobytes()
+        key = (self._key * (len(data) // len(self._key) + 1))[:len(data)]
+        return (int.from_bytes(data, 'big') ^ int.from_bytes(key, 'big')).to_bytes(len(data), 'big')
+
+    def encode(self, data):
+        return bytes_to_dna(self._xor(data))
+
+    def decode(self, dna):
+        return self._xor(dna_to_bytes(self._bases(dna)))
+
+
+class GoldmanScheme(Scheme):
+    # Each byte is 6 base-3 digits (3**6 = 729 >= 256) and each digit is
+    # written as one of the 3 bases after the previous one in ATGC order.
+    # The code depends on the previous base, so the tables are per
+    # previous base: (previous, byte) -> 6 bases and (previous base + 6
+    # bases) -> byte. The sequence starts as if preceded by an 'A'.
+    bases_per_byte = 6
+
+    def __init__(self, name='goldman'):
+        super().__init__(name)
+        self._encode = [[None] * 256 for _ in BASES]
+        self._decode = {}
+        for previous in range(4):
+            for byte in range(256):
+                digits = [byte // 3 ** power % 3 for power in range(5, -1, -1)]
+                base, bases = previous, []
+                for digit in digits:
+                    base = (base + 1 + digit) % 4
+                    bases.append(BASES[base])
+                group = ''.join(bases)
+                self._encode[previous][byte] = (group, base)
+                self._decode[BASES[previous] + group] = byte
+
+    def encode(self, data):
+        parts = []
+        previous = 0
+        table = self._encode
+        for byte in data:
+            bases, previous = table[previous][byte]
+            parts.append(bases)
+        return ''.join(parts)
+
+    def decode(self, dna):
+        dna = 'A' + self._bases(dna)
+        table = self._decode
+        try:
+            return bytes([table[dna[i:i + 7]] for i in range(0, len(dna) - 1, 6)])
+        except KeyError:
+            raise ValueError('invalid DNA for the %s scheme, it never repeats a base '
+                             'and each 6 bases must give a byte' % self.name) from None
+
+
+SCHEMES = {}
+
+
+def register(scheme):
+    SCHEMES[scheme.name] = scheme
+    return scheme
+
+
+def get_scheme(name=None):
+    # None means standard. Unregistered permutations of ATGC are compiled
+    # and registered on first use.
+    name = name or 'standard'
+    if not isinstance(name, str):
+        raise ValueError('scheme must be given by name')
+    scheme = SCHEMES.get(name)
+    if scheme is not None:
+        return scheme
+    order = name.upper()
+    if order in SCHEMES:
+        return SCHEMES[order]
+    if order in (''.join(bases) for bases in permutations(BASES)):
+        return register(PermutationScheme(order, order))
+    raise ValueError('unknown scheme %r, available: %s (or any order of ATGC)' % (name, ', '.join(SCHEMES)))
+
+
+register(StandardScheme())
+register(PermutationScheme('acgt', 'ACGT'))
+register(PermutationScheme('twobit', 'TCAG'))
+register(ScrambledScheme())
+register(GoldmanScheme())
@@ -0,0 +1,203 @@
+import re
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, KmerIndex falls back to a dict
+    np = None
+
+from codec import _DNA_DIGITS, PackedDNA, _is_bases, bytes_to_dna, normalize_dna
+
+# Search over encoded DNA without decoding it. Sequences are held packed
+# (PackedDNA, 4 bases per byte), so matching runs on bytes with the
+# bytes.find C loop:
+#
+#   find_bases(dna, 'GATTACA')      base offsets of a DNA pattern
+#   find_text(dna, 'needle')        byte offsets of an encoded phrase
+#   KmerIndex(dna, k=12)            k-mer -> positions, counts, bulk lookup
+#
+# An encoded phrase always starts on a byte boundary (a multiple of 4
+# bases), so find_text is a plain bytes search. A free DNA pattern can
+# start at any of the 4 bases in a byte; for each of those phases its
+# whole-byte middle is searched as bytes and the partial bytes at either
+# end are checked against bit masks.
+
+
+def _packed(dna):
+    return dna if isinstance(dna, PackedDNA) else PackedDNA(dna)
+
+
+def _pattern(pattern):
+    pattern = normalize_dna(pattern)
+    if not pattern:
+        raise ValueError('empty DNA pattern')
+    if not _is_bases(pattern):
+        raise ValueError('invalid DNA pattern, expected only A, T, G and C')
+    return pattern
+
+
+def _code(dna):
+    # A/T/G/C string -> its bases as one integer, 2 bits each
+    return int(dna.encode('ascii').translate(_DNA_DIGITS), 4) if dna else 0
+
+
+def _find_all(data, needle, end=None):
+    # Start of every occurrence of needle in data[:end], overlapping ones too
+    end = len(data) if end is None else end
+    start = data.find(needle, 0, end)
+    while start != -1:
+        yield start
+        start = data.find(needle, start + 1, end)
+
+
+def find_bases(haystack, pattern, aligned=False):
+    # Sorted base offsets of every occurrence of pattern in haystack (DNA
+    # string or PackedDNA). With aligned, only offsets that are a multiple
+    # of 4, i.e. matches that start on a byte of the decoded data.
+    packed = _packed(haystack)
+    pattern = _pattern(pattern)
+    data = bytes(packed.memoryview())
+    length, size = len(packed), len(pattern)
+    if size < (4 if aligned else 7):
+        # Too short to have a whole byte in every phase, scan the bases
+        offsets = [match.start() for match in re.finditer('(?=%s)' % pattern, str(packed))]
+        return [offset for offset in offsets if offset % 4 == 0] if aligned else offsets
+
+    offsets = []
+    for phase in ((0,) if aligned else range(4)):
+        head = -phase % 4
+        middle = (size - head) // 4
+        tail = size - head - 4 * middle
+        head_code = _code(pattern[:head])
+        head_mask = (1 << 2 * head) - 1
+        tail_code = _code(pattern[size - tail:]) << 2 * (4 - tail) if tail else 0
+        tail_mask = ((1 << 2 * tail) - 1) << 2 * (4 - tail)
+        needle = PackedDNA(pattern[head:head + 4 * middle]).to_bytes()
+        for start in _find_all(data, needle):
+            offset = 4 * start - head
+            if offset < 0 or offset + size > length:
+                continue
+            if head and data[start - 1] & head_mask != head_code:
+                continue
+            if tail and data[start + middle] & tail_mask != tail_code:
+                continue
+            offsets.append(offset)
+    offsets.sort()
+    return offsets
+
+
+def find_text(haystack, text, encoding=None):
+    # Byte offsets (characters in the default one-byte layout) of text in
+    # the data that haystack encodes, found without decoding it
+    needle = text.encode(encoding or 'latin-1')
+    if not needle:
+        raise ValueError('empty search text')
+    packed = _packed(haystack)
+    return list(_find_all(bytes(packed.memoryview()), needle, len(packed) // 4))
+
+
+class KmerIndex:
+    # Every k-mer of a sequence and where it occurs. With NumPy the k-mers
+    # are kept as one sorted array of 2-bit codes and looked up with a
+    # binary search; without it they go in a dict of position arrays.
+    def __init__(self, dna, k=12):
+        if not 1 <= k <= 32:
+            raise ValueError('k must be between 1 and 32')
+        self.k = k
+        self.dna = _packed(dna)
+        self.length = len(self.dna)
+        if np is not None:
+            self._build_numpy()
+        else:
+            self._build_python()
+
+    def _build_numpy(self):
+        k, count = self.k, max(self.length - self.k + 1, 0)
+        packed = np.frombuffer(self.dna.memoryview(), dtype=np.uint8)
+        dtype = np.uint32 if k <= 16 else np.uint64
+        bases = ((packed[:, None] >> np.array([6, 4, 2, 0], dtype=np.uint8)) & 3).ravel().astype(dtype)
+        codes = np.zeros(count, dtype=dtype)
+        for i in range(k):
+            codes <<= dtype(2)
+            codes |= bases[i:i + count]
+        order = np.argsort(codes, kind='stable')
+        self._codes = codes[order]
+        self._positions = order.astype(np.uint32 if self.length < 1 << 32 else np.uint64)
+        self._table = None
+
+    def _build_python(self):
+        k, mask = self.k, (1 << 2 * self.k) - 1
+        table = {}
+        code = 0
+        digits = str(self.dna).encode('ascii').translate(_DNA_DIGITS)
+        for position, digit in enumerate(digits):
+            code = (code << 2 | digit - 48) & mask
+            if position >= k - 1:
+                positions = table.get(code)
+                if positions is None:
+                    positions = table[code] = array('Q')
+                positions.append(position - k + 1)
+        self._table = table
+
+    def _kmer(self, code):
+        return ''.join('ATGC'[code >> 2 * (self.k - 1 - i) & 3] for i in range(self.k))
+
+    def _lookup(self, kmer):
+        kmer = _pattern(kmer)
+        if len(kmer) != self.k:
+            raise ValueError('expected a %d-mer, got %d bases' % (self.k, len(kmer)))
+        code = _code(kmer)
+        if self._table is not None:
+            return list(self._table.get(code, ()))
+        low = np.searchsorted(self._codes, code, side='left')
+        high = np.searchsorted(self._codes, code, side='right')
+        return self._positions[low:high].tolist()
+
+    def positions(self, kmer):
+        # Sorted base offsets of one k-mer
+        return self._lookup(kmer)
+
+    def count(self, kmer):
+        return len(self._lookup(kmer))
+
+    def most_common(self, n=None):
+        # [(k-mer, count)] from most to least frequent, like Counter.most_common
+        if self._table is not None:
+            counts = [(code, len(positions)) for code, positions in self._table.items()]
+        else:
+            if not len(self._codes):
+                return []
+            starts = np.flatnonzero(np.diff(self._codes)) + 1
+            starts = np.concatenate(([0], starts))
+            sizes = np.diff(np.concatenate((starts, [len(self._codes)])))
+            counts = list(zip(self._codes[starts].tolist(), sizes.tolist()))
+        counts.sort(key=lambda item: (-item[1], item[0]))
+        return [(self._kmer(code), size) for code, size in counts[:n]]
+
+    def find(self, pattern, aligned=False):
+        # Occurrences of a pattern of any length: patterns of k bases or
+        # more are looked up by their first k-mer and checked for the rest,
+        # shorter ones fall back to find_bases
+        pattern = _pattern(pattern)
+        if len(pattern) < self.k:
+            return find_bases(self.dna, pattern, aligned)
+        offsets = self._lookup(pattern[:self.k])
+        if aligned:
+            offsets = [offset for offset in offsets if offset % 4 == 0]
+        rest = pattern[self.k:]
+        if not rest:
+            return offsets
+        size = len(pattern)
+        return [offset for offset in offsets
+                if offset + size <= self.length and self.dna[offset + self.k:offset + size] == rest]
+
+    def find_many(self, patterns, aligned=False):
+        # {pattern: offsets} for a batch of patterns
+        return {pattern: self.find(pattern, aligned) for pattern in patterns}
+
+    def find_text(self, text, encoding=None):
+        # Byte offsets of an encoded phrase, found through the index
+        pattern = bytes_to_dna(text.encode(encoding or 'latin-1'))
+        if not pattern:
+            raise ValueError('empty search text')
+        return [offset // 4 for offset in self.find(pattern, aligned=True)]
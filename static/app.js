@@ -0,0 +1,206 @@
+// Create floating DNA helixes
+function createHelixes() {
+    const container = document.getElementById('helixContainer');
+    for (let i = 0; i < 15; i++) {
+        const helix = document.createElement('div');
+        helix.className = 'helix';
+        helix.style.left = Math.random() * 100 + 'vw';
+        helix.style.animationDelay = Math.random() * 15 + 's';
+        container.appendChild(helix);
+    }
+}
+
+// Copy to clipboard function
+function copyToClipboard(text) {
+    navigator.clipboard.writeText(text).then(function() {
+        // Show a subtle notification instead of alert
+        const copyBtn = event.target;
+        const originalText = copyBtn.textContent;
+        copyBtn.textContent = 'Copied!';
+        copyBtn.style.background = 'rgba(0, 255, 136, 0.3)';
+        copyBtn.style.borderColor = 'var(--accent)';
+        
+        setTimeout(() => {
+            copyBtn.textContent = originalText;
+            copyBtn.style.background = 'rgba(0, 240, 255, 0.2)';
+            copyBtn.style.borderColor = 'var(--primary)';
+        }, 2000);
+    }, function(err) {
+        console.error('Could not copy text: ', err);
+        alert('Failed to copy to clipboard');
+    });
+}
+
+// Live conversion while typing. Only the edited segment goes to
+// /api/v1/live/<mode>, and only the output span it affects is replaced,
+// so each keystroke costs about the same however long the input is.
+
+// Input symbols per unit (a byte is 1 character, 4 bases or 8 bits)
+const LIVE_UNITS = {
+    'text_to_dna': 1, 'text_to_binary': 1,
+    'dna_to_text': 4, 'dna_to_binary': 1,
+    'binary_to_text': 8, 'binary_to_dna': 2
+};
+// Input that converts unit by unit; anything else is sent whole
+const SEGMENT_INPUT = {
+    'text_to_dna': /^[\x00-\xff]*$/, 'text_to_binary': /^[\x00-\xff]*$/,
+    'dna_to_text': /^[ATGCatgc]*$/, 'dna_to_binary': /^[ATGCatgc]*$/,
+    'binary_to_text': /^[01]*$/, 'binary_to_dna': /^[01]*$/
+};
+
+function liveResultNode(form) {
+    // The card's result box as a single text node, created if needed
+    const card = form.closest('.converter-card');
+    let box = card.querySelector('.result-box');
+    if (!box) {
+        const container = document.createElement('div');
+        container.className = 'result-container';
+        container.innerHTML = '<div class="result-label">📊 Live Output</div>' +
+            '<button type="button" class="copy-btn">Copy</button><div class="result-box"></div>';
+        card.appendChild(container);
+        box = container.querySelector('.result-box');
+    }
+    if (box.childNodes.length !== 1 || box.firstChild.nodeType !== Node.TEXT_NODE) {
+        box.textContent = box.textContent;
+        if (!box.firstChild) {
+            box.appendChild(document.createTextNode(''));
+        }
+    }
+    box.parentElement.querySelector('.copy-btn').onclick = () => copyToClipboard(box.textContent);
+    return box.firstChild;
+}
+
+function setupLiveConversion(form) {
+    const textarea = form.querySelector('textarea');
+    // input: the input the output currently shows, null to convert in full
+    const state = { input: null, clean: false, busy: false, pending: false };
+    const option = name => {
+        const select = form.querySelector('select[name="' + name + '"]');
+        return select ? select.value : '';
+    };
+
+    function request(mode, input) {
+        const old = state.input;
+        const pattern = SEGMENT_INPUT[mode];
+        const segmented = option('scheme') === 'standard' && option('text_encoding') === 'legacy';
+        if (old === null || !segmented) {
+            state.clean = pattern.test(input);
+            return { data: input, offset: 0, replaced: null };
+        }
+        // The edit is what lies between the common prefix and suffix
+        const shortest = Math.min(old.length, input.length);
+        let prefix = 0;
+        while (prefix < shortest && old.charCodeAt(prefix) === input.charCodeAt(prefix)) {
+            prefix++;
+        }
+        let suffix = 0;
+        while (suffix < shortest - prefix &&
+               old.charCodeAt(old.length - 1 - suffix) === input.charCodeAt(input.length - 1 - suffix)) {
+            suffix++;
+        }
+        state.clean = state.clean ? pattern.test(input.slice(prefix, input.length - suffix)) : pattern.test(input);
+        if (!state.clean) {
+            return { data: input, offset: 0, replaced: null };
+        }
+        const unit = LIVE_UNITS[mode];
+        const start = prefix - prefix % unit;
+        const delta = input.length - old.length;
+        if (delta % unit === 0) {
+            // Later units keep their place: convert up to the last edited one
+            const stop = Math.ceil((input.length - suffix) / unit) * unit;
+            if (stop < input.length) {
+                return { data: input.slice(start, stop), offset: start, replaced: stop - delta - start };
+            }
+        }
+        // Later units shift, everything from the edit on changes
+        return { data: input.slice(start), offset: start, replaced: null };
+    }
+
+    async function sync() {
+        if (state.busy) {
+            state.pending = true;
+            return;
+        }
+        const mode = option('conversion');
+        const input = textarea.value;
+        if (input === state.input || !(mode in LIVE_UNITS)) {
+            return;
+        }
+        const body = request(mode, input);
+        body.scheme = option('scheme');
+        body.text_encoding = option('text_encoding');
+        state.busy = true;
+        const node = liveResultNode(form);
+        try {
+            const response = await fetch('/api/v1/live/' + mode, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(body)
+            });
+            const reply = await response.json();
+            if (!response.ok) {
+                node.data = 'Error: ' + reply.error;
+                state.input = null;
+            } else if (body.offset === 0 && body.replaced === null) {
+                node.data = reply.result;
+                state.input = input;
+            } else {
+                const length = reply.length === null ? node.length - reply.offset : reply.length;
+                node.replaceData(reply.offset, length, reply.result);
+                state.input = input;
+            }
+        } catch (err) {
+            console.error('Live conversion failed: ', err);
+            state.input = null;
+        } finally {
+            state.busy = false;
+            if (state.pending) {
+                state.pending = false;
+                sync();
+            }
+        }
+    }
+
+    textarea.addEventListener('input', sync);
+    form.querySelectorAll('select').forEach(select => {
+        select.addEventListener('change', function() {
+            state.input = null;
+            sync();
+        });
+    });
+}
+
+// Initialize
+document.addEventListener('DOMContentLoaded', function() {
+    createHelixes();
+    document.querySelectorAll('.converter-card form').forEach(setupLiveConversion);
+
+    // Add interactive effects
+    const inputs = document.querySelectorAll('input, select, textarea');
+    inputs.forEach(input => {
+        input.addEventListener('focus', function() {
+            this.parentElement.style.transform = 'scale(1.02)';
+        });
+        
+        input.addEventListener('blur', function() {
+            this.parentElement.style.transform = 'scale(1)';
+        });
+    });
+
+    // Update placeholders based on selection
+    const conversionSelects = document.querySelectorAll('select[name="conversion"]');
+    conversionSelects.forEach(select => {
+        select.addEventListener('change', function() {
+            const textarea = this.closest('form').querySelector('textarea');
+            const options = {
+                'text_to_dna': 'Enter text to convert to DNA sequence...',
+                'text_to_binary': 'Enter text to convert to binary...',
+                'binary_to_dna': 'Enter binary code (e.g., 01001000) to convert to DNA...',
+                'dna_to_text': 'Enter DNA sequence (e.g., ATGC) to decode to text...',
+                'dna_to_binary': 'Enter DNA sequence to convert to binary...',
+                'binary_to_text': 'Enter binary code to decode to text...'
+            };
+            textarea.placeholder = options[this.value] || 'Enter data...';
+        });
+    });
+});
@@ -0,0 +1,165 @@
+import codecs
+
+from codec import (
+    CONVERTERS, TEXT_INPUT, TEXT_OUTPUT, VALIDATORS, binary_to_bytes, binary_to_dna_seq,
+    bytes_to_binary, bytes_to_dna, dna_to_bytes, normalize_dna, text_to_binary,
+)
+
+# Streaming versions of the converters in codec.py. Input arrives as an
+# iterable of str or bytes chunks (bytes are decoded as UTF-8 like form
+# data unless another encoding is given), output is yielded chunk by
+# chunk. Each converter only keeps the few symbols that do not yet form a
+# whole unit, so memory stays bounded by the chunk size and the joined
+# output always equals the whole-string conversion. text_encoding and
+# text_errors select the encoded text mode of the codec's text converters,
+# run through incremental encoders/decoders so split multi-byte characters
+# and byte order marks are handled across chunks too.
+
+CHUNK_SIZE = 1 << 20
+
+# Input symbols that make up one unit of output, per mode
+_UNIT = {
+    'text_to_dna': 1,
+    'dna_to_text': 4,
+    'binary_to_dna': 2,
+    'dna_to_binary': 1,
+    'text_to_binary': 1,
+    'binary_to_text': 8,
+}
+# Per-symbol cleanup the whole-string converter does before splitting
+_PREPARE = {
+    'dna_to_text': normalize_dna,
+    'binary_to_dna': lambda binary: binary.replace(' ', ''),
+    'dna_to_binary': normalize_dna,
+}
+
+
+class IncrementalConverter:
+    def __init__(self, mode, errors='replace', encoding='utf-8', strict=False,
+                 text_encoding=None, text_errors='strict'):
+        if mode not in CONVERTERS:
+            raise ValueError('unknown conversion mode %r' % mode)
+        self.mode = mode
+        self._convert = CONVERTERS[mode]
+        self._unit = _UNIT[mode]
+        self._prepare = _PREPARE.get(mode)
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors)
+        self._pending = ''
+        # With strict, each chunk is validated before it is converted
+        self._validate = VALIDATORS.get(mode) if strict else None
+        self._offset = 0
+        self._text_encoder = self._text_decoder = None
+        if text_encoding not in (None, 'legacy'):
+            if mode in TEXT_INPUT:
+                self._text_encoder = codecs.getincrementalencoder(text_encoding)()
+                self._from_bytes = bytes_to_dna if mode == 'text_to_dna' else bytes_to_binary
+                self._convert = self._encode_text
+            elif mode in TEXT_OUTPUT:
+                self._text_decoder = codecs.getincrementaldecoder(text_encoding)(text_errors)
+                self._to_bytes = dna_to_bytes if mode == 'dna_to_text' else binary_to_bytes
+                self._convert = self._decode_text
+
+    def _encode_text(self, text, final=False):
+        return self._from_bytes(self._text_encoder.encode(text, final))
+
+    def _decode_text(self, data, final=False):
+        return self._text_decoder.decode(self._to_bytes(data), final)
+
+    def _text(self, chunk, final=False):
+        if isinstance(chunk, (bytes, bytearray, memoryview)):
+            chunk = self._decoder.decode(chunk, final)
+        if self._validate is not None:
+            self._validate(chunk, self._offset)
+            self._offset += len(chunk)
+        if self._prepare is not None:
+            chunk = self._prepare(chunk)
+        return chunk
+
+    def feed(self, chunk):
+        return self._feed_text(self._text(chunk))
+
+    def flush(self):
+        # Whatever is left is less than one unit, which the whole-string
+        # converters drop as well
+        out = self._feed_text(self._text(b'', final=True))
+        self._pending = ''
+        if self._text_encoder is not None:
+            out += self._encode_text('', True)
+        elif self._text_decoder is not None:
+            out += self._decode_text('', True)
+        return out
+
+    def _feed_text(self, text):
+        data = self._pending + text
+        cut = len(data) - len(data) % self._unit
+        self._pending = data[cut:]
+        return self._convert(data[:cut]) if cut else ''
+
+
+class _IncrementalTextToDna(IncrementalConverter):
+    # Latin-1 characters are whole bytes and go straight to 4 bases. Code
+    # points above 255 take a variable number of bits, so an odd bit can
+    # be left over and has to be carried into the next chunk.
+
+    def _feed_text(self, text):
+        if not self._pending:
+            try:
+                return bytes_to_dna(text.encode('latin-1'))
+            except UnicodeEncodeError:
+                pass
+        bits = self._pending + text_to_binary(text)
+        cut = len(bits) - len(bits) % 2
+        self._pending = bits[cut:]
+        return binary_to_dna_seq(bits[:cut])
+
+
+def incremental_converter(mode, errors='replace', encoding='utf-8', strict=False,
+                          text_encoding=None, text_errors='strict'):
+    if mode == 'text_to_dna' and text_encoding in (None, 'legacy'):
+        return _IncrementalTextToDna(mode, errors, encoding, strict)
+    return IncrementalConverter(mode, errors, encoding, strict, text_encoding, text_errors)
+
+
+def iter_convert(mode, chunks, errors='replace', encoding='utf-8', strict=False,
+                 text_encoding=None, text_errors='strict'):
+    converter = incremental_converter(mode, errors, encoding, strict, text_encoding, text_errors)
+    for chunk in chunks:
+        out = converter.feed(chunk)
+        if out:
+            yield out
+    out = converter.flush()
+    if out:
+        yield out
+
+
+def iter_text_to_dna(chunks):
+    return iter_convert('text_to_dna', chunks)
+
+
+def iter_dna_to_text(chunks):
+    return iter_convert('dna_to_text', chunks)
+
+
+def iter_binary_to_dna(chunks):
+    return iter_convert('binary_to_dna', chunks)
+
+
+def iter_dna_to_binary(chunks):
+    return iter_convert('dna_to_binary', chunks)
+
+
+def iter_text_to_binary(chunks):
+    return iter_convert('text_to_binary', chunks)
+
+
+def iter_binary_to_text(chunks):
+    return iter_convert('binary_to_text', chunks)
+
+
+def read_chunks(fileobj, size=CHUNK_SIZE):
+    # Iterate over a file-like object without reading it all at once
+    while True:
+        chunk = fileobj.read(size)
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+from api import LIVE_UNITS
+from asgi import ConversionServer
+from codec import CONVERTERS
+from limits import client_limiter
+from main import app
+
+# Symbols the live page can type for each mode, all clean
+ALPHABETS = {
+    'text_to_dna': 'abcAZ \xe9\xff\n',
+    'text_to_binary': 'abcAZ \xe9\xff\n',
+    'dna_to_text': 'ATGCatgc',
+    'dna_to_binary': 'ATGCatgc',
+    'binary_to_text': '01',
+    'binary_to_dna': '01',
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(client_limiter, 'enabled', False)
+    return app.test_client()
+
+
+def segment(mode, old, new):
+    # The request static/app.js sends for an edit from old to new
+    unit = LIVE_UNITS[mode][0]
+    shortest = min(len(old), len(new))
+    prefix = 0
+    while prefix < shortest and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < shortest - prefix and old[len(old) - 1 - suffix] == new[len(new) - 1 - suffix]:
+        suffix += 1
+    start = prefix - prefix % unit
+    delta = len(new) - len(old)
+    if delta % unit == 0:
+        stop = -(-(len(new) - suffix) // unit) * unit
+        if stop < len(new):
+            return {'data': new[start:stop], 'offset': start, 'replaced': stop - delta - start}
+    return {'data': new[start:], 'offset': start, 'replaced': None}
+
+
+@pytest.mark.parametrize('mode', sorted(LIVE_UNITS))
+def test_live_splice_matches_whole(client, mode):
+    rng = random.Random(mode)
+    unit = LIVE_UNITS[mode][0]
+    alphabet = ALPHABETS[mode]
+    old = ''.join(rng.choice(alphabet) for _ in range(unit * 20))
+    output = CONVERTERS[mode](old)
+    for _ in range(200):
+        start = rng.randint(0, len(old))
+        stop = rng.randint(start, min(len(old), start + 2 * unit))
+        typed = ''.join(rng.choice(alphabet) for _ in range(rng.choice([0, 1, unit, 2 * unit])))
+        new = old[:start] + typed + old[stop:]
+        body = segment(mode, old, new)
+        response = client.post('/api/v1/live/' + mode, json=body)
+        assert response.status_code == 200, response.get_json()
+        reply = response.get_json()
+        end = len(output) if reply['length'] is None else reply['offset'] + reply['length']
+        output = output[:reply['offset']] + reply['result'] + output[end:]
+        assert output == CONVERTERS[mode](new), (old, new, body)
+        old = new
+
+
+@pytest.mark.parametrize('mode, data', [
+    ('text_to_dna', 'Ā'),
+    ('text_to_binary', '中'),
+    ('dna_to_text', 'ATG CATGC'),
+    ('dna_to_binary', 'ATNC'),
+    ('binary_to_text', '0100 0001'),
+    ('binary_to_dna', '0120'),
+])
+def test_live_rejects_unclean_segments(client, mode, data):
+    unit = LIVE_UNITS[mode][0]
+    for body in ({'data': data, 'offset': unit}, {'data': data, 'offset': 0, 'replaced': unit}):
+        response = client.post('/api/v1/live/' + mode, json=body)
+        assert response.status_code == 400
+        assert 'segments may only contain' in response.get_json()['error']
+
+
+def test_live_whole_input_may_be_unclean(client):
+    response = client.post('/api/v1/live/text_to_binary', json={'data': 'Ā', 'offset': 0, 'replaced': None})
+    assert response.status_code == 200
+    assert response.get_json()['result'] == CONVERTERS['text_to_binary']('Ā')
+
+
+def call_asgi(path, body):
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': 'POST', 'path': path, 'headers': [], 'client': ('127.0.0.1', 0)}
+    server = ConversionServer()
+    asyncio.run(server(scope, receive, send))
+    server.shutdown()
+    return sent[0]['status'], b''.join(message.get('body', b'') for message in sent[1:])
+
+
+def test_asgi_live(monkeypatch):
+    monkeypatch.setattr(client_limiter, 'enabled', False)
+    status, body = call_asgi('/api/v1/live/text_to_dna', json.dumps({'data': 'i', 'offset': 1}).encode())
+    assert status == 200
+    assert json.loads(body) == {'offset': 4, 'length': None, 'result': 'TGGT'}
+    status, body = call_asgi('/api/v1/live/text_to_dna', json.dumps({'data': 'Ā', 'offset': 1}).encode())
+    assert status == 400
+    assert 'error' in json.loads(body)
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+import framing
+from framing import CRC_BASES, FrameError, FramedReader, frame
+
+DATA = os.urandom(1000)
+BLOCK_SIZE = 64
+HEADER_BASES = framing._HEADER_BASES
+BLOCK_BASES = BLOCK_SIZE * 4
+
+# One position in each part of the framed DNA
+POSITIONS = {
+    'header': 5,
+    'header end': HEADER_BASES - 1,
+    'header CRC': HEADER_BASES + 6,
+    'block': HEADER_BASES + CRC_BASES + 10,
+    'block CRC': HEADER_BASES + CRC_BASES + BLOCK_BASES + 3,
+    'last block': HEADER_BASES + 3 * (BLOCK_BASES + CRC_BASES) + 1000 % BLOCK_SIZE * 4 - 1,
+    'last block CRC': HEADER_BASES + 3 * (BLOCK_BASES + CRC_BASES) + 1000 % BLOCK_SIZE * 4 + CRC_BASES - 1,
+}
+
+
+def damaged(framed, position, base):
+    return framed[:position] + base + framed[position + 1:]
+
+
+def other_base(base):
+    return 'ATGC'['ATGC'.index(base) - 1]
+
+
+@pytest.mark.parametrize('where', sorted(POSITIONS))
+@pytest.mark.parametrize('error', ['unreadable', 'substituted'])
+def test_repairs_one_base(where, error):
+    framed = frame(DATA, BLOCK_SIZE)
+    position = POSITIONS[where]
+    framed = damaged(framed, position, 'N' if error == 'unreadable' else other_base(framed[position]))
+    for errors in ('repair', 'skip'):
+        reader = FramedReader(framed)
+        assert reader.decode(errors) == DATA
+        assert not reader.skipped
+    if where.startswith('header'):
+        # The header is repaired even for strict decoding
+        assert FramedReader(framed).decode() == DATA
+    else:
+        with pytest.raises(FrameError):
+            FramedReader(framed).decode()
+
+
+def test_two_header_errors_are_reported():
+    framed = frame(DATA, BLOCK_SIZE)
+    framed = damaged(damaged(framed, 5, 'N'), 20, 'N')
+    with pytest.raises(FrameError, match='header is damaged'):
+        FramedReader(framed)
+
+
+def test_skip_leaves_out_blocks_it_cannot_repair():
+    framed = frame(DATA, BLOCK_SIZE)
+    start = HEADER_BASES + CRC_BASES + BLOCK_BASES + CRC_BASES
+    framed = damaged(damaged(framed, start, 'N'), start + 1, 'N')
+    reader = FramedReader(framed)
+    assert reader.verify() == [1]
+    assert reader.decode('skip') == DATA[:BLOCK_SIZE] + DATA[2 * BLOCK_SIZE:]
+    assert reader.skipped == [1]
+    with pytest.raises(FrameError):
+        reader.decode('repair')
+
+
+def test_lost_base_is_detected():
+    framed = frame(DATA, BLOCK_SIZE)
+    with pytest.raises(FrameError, match='inserted or lost'):
+        FramedReader(framed[:200] + framed[201:])
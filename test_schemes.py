@@ -0,0 +1,53 @@
+import os
+import re
+
+import pytest
+
+import schemes
+from schemes import SCHEMES, get_scheme
+
+# Repeated bytes and digits, which the standard code writes as long runs
+# or fixed GC shares (zero bytes as all A's, 0xff as all C's)
+STRUCTURED = [bytes([byte]) * 8192 for byte in (0x00, 0x39, 0xe4, 0xff, 0x55)] + [
+    b'0123456789' * 1000,
+    b'Order #99999, total 1999.99\n' * 300,
+]
+
+
+def longest_run(dna):
+    return max(len(match.group()) for match in re.finditer(r'(.)\1*', dna))
+
+
+def gc_share(dna):
+    return (dna.count('G') + dna.count('C')) / len(dna)
+
+
+@pytest.mark.parametrize('name', sorted(SCHEMES))
+def test_round_trip(name):
+    scheme = get_scheme(name)
+    for data in (b'', b'Hi', bytes(range(256)), os.urandom(10001)):
+        assert scheme.decode(scheme.encode(data)) == data
+    text = 'Ā中\U0001f600 héllo'
+    dna = scheme.converters['text_to_dna'](text, encoding='utf-8')
+    assert scheme.converters['dna_to_text'](dna, encoding='utf-8') == text
+
+
+@pytest.mark.parametrize('data', STRUCTURED, ids=lambda data: repr(data[:4]))
+def test_scrambled_runs_and_gc(data):
+    dna = get_scheme('scrambled').encode(data)
+    assert longest_run(dna) <= 12
+    assert 0.45 <= gc_share(dna) <= 0.55
+
+
+def test_scrambled_without_numpy(monkeypatch):
+    scheme = get_scheme('scrambled')
+    data = os.urandom(10001)
+    dna = scheme.encode(data)
+    monkeypatch.setattr(schemes, 'np', None)
+    assert scheme.encode(data) == dna
+    assert scheme.decode(dna) == data
+
+
+def test_goldman_never_repeats():
+    dna = get_scheme('goldman').encode(os.urandom(10000))
+    assert longest_run(dna) == 1